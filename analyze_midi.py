@@ -1,63 +1,93 @@
+import io
 import mido
 import os
+import sys
+from array import array
 from collections import defaultdict
+from functools import lru_cache
+
+def _channel_notes():
+    """Compact per-channel note storage: one typed array per field"""
+    return {'note': array('B'), 'velocity': array('B'), 'time': array('q')}
+
+@lru_cache(maxsize=32)
+def _load_midi(filepath, mtime, size):
+    """Parse a MIDI file; mtime and size make edited files miss the cache"""
+    # One read syscall, then mido parses from memory instead of many small reads
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    return mido.MidiFile(filepath, file=io.BytesIO(data))
+
+def load_midi(filepath):
+    """Parse a MIDI file, reusing the previous parse if the file is unchanged"""
+    stat = os.stat(filepath)
+    return _load_midi(filepath, stat.st_mtime, stat.st_size)
+
+NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
 
 def analyze_midi(filepath):
     """Comprehensive MIDI analysis"""
-    print(f"\n{'='*60}")
-    print(f"Analyzing: {os.path.basename(filepath)}")
-    print(f"{'='*60}")
+    # Report lines are buffered and written once per file header / track
+    out = [f"\n{'='*60}",
+           f"Analyzing: {os.path.basename(filepath)}",
+           f"{'='*60}"]
     
     try:
-        mid = mido.MidiFile(filepath)
-        print(f"Type: {mid.type}")
-        print(f"Number of tracks: {len(mid.tracks)}")
-        print(f"Ticks per beat: {mid.ticks_per_beat}")
+        mid = load_midi(filepath)
+        out.append(f"Type: {mid.type}")
+        out.append(f"Number of tracks: {len(mid.tracks)}")
+        out.append(f"Ticks per beat: {mid.ticks_per_beat}")
+        sys.stdout.write("\n".join(out) + "\n")
         
         # Analyze each track
         for i, track in enumerate(mid.tracks):
-            print(f"\n--- Track {i}: {track.name} ---")
+            out = [f"\n--- Track {i}: {track.name} ---"]
             
-            notes_by_channel = defaultdict(list)
+            notes_by_channel = defaultdict(_channel_notes)
             time = 0
             tempo = 500000  # Default tempo (120 BPM)
             
+            # Only note_on and set_tempo matter; test the type once and skip the rest
             for msg in track:
                 time += msg.time
+                msg_type = msg.type
                 
-                if msg.type == 'set_tempo':
+                if msg_type == 'note_on':
+                    velocity = msg.velocity
+                    if velocity > 0:
+                        notes = notes_by_channel[msg.channel]
+                        notes['note'].append(msg.note)
+                        notes['velocity'].append(velocity)
+                        notes['time'].append(time)
+                
+                elif msg_type == 'set_tempo':
                     tempo = msg.tempo
                     bpm = mido.tempo2bpm(tempo)
-                    print(f"  Tempo: {bpm:.1f} BPM")
-                
-                if msg.type == 'note_on' and msg.velocity > 0:
-                    notes_by_channel[msg.channel].append({
-                        'note': msg.note,
-                        'velocity': msg.velocity,
-                        'time': time,
-                        'channel': msg.channel
-                    })
+                    out.append(f"  Tempo: {bpm:.1f} BPM")
             
-            # Print note statistics per channel
+            # Note statistics per channel
             for channel, notes in notes_by_channel.items():
-                if notes:
-                    note_nums = [n['note'] for n in notes]
-                    print(f"  Channel {channel}:")
-                    print(f"    Notes: {len(notes)}")
-                    print(f"    Range: {min(note_nums)} - {max(note_nums)}")
-                    print(f"    Unique notes: {sorted(set(note_nums))[:20]}")  # First 20
+                note_nums = notes['note']
+                if note_nums:
+                    out.append(f"  Channel {channel}:")
+                    out.append(f"    Notes: {len(note_nums)}")
+                    out.append(f"    Range: {min(note_nums)} - {max(note_nums)}")
+                    out.append(f"    Unique notes: {sorted(set(note_nums))[:20]}")  # First 20
                     
                     # Sample first few notes with timing
-                    print(f"    First 8 notes pattern:")
-                    for note in notes[:8]:
-                        note_name = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B'][note['note'] % 12]
-                        octave = note['note'] // 12 - 1
-                        print(f"      {note_name}{octave} (MIDI {note['note']}) @ tick {note['time']}, vel {note['velocity']}")
+                    out.append(f"    First 8 notes pattern:")
+                    for note, velocity, tick in zip(note_nums[:8], notes['velocity'][:8], notes['time'][:8]):
+                        note_name = NOTE_NAMES[note % 12]
+                        octave = note // 12 - 1
+                        out.append(f"      {note_name}{octave} (MIDI {note}) @ tick {tick}, vel {velocity}")
+            
+            sys.stdout.write("\n".join(out) + "\n")
         
         return mid
         
     except Exception as e:
-        print(f"Error: {e}")
+        out.append(f"Error: {e}")
+        sys.stdout.write("\n".join(out) + "\n")
         return None
 
 if __name__ == "__main__":
@@ -4,39 +4,85 @@ A celebration of computational beauty and chaos
 """
 
 import pygame
+import colorsys
 import math
-import random
+from collections import deque
 import numpy as np
 
 
+# Lorenz system constants
+LORENZ_DT = 0.01
+LORENZ_SIGMA = 10.0
+LORENZ_RHO = 28.0
+LORENZ_BETA = 8.0 / 3.0
+
+
+# Fully saturated, full value RGB for each integer hue
+HUE_RGB = np.array([colorsys.hsv_to_rgb(h / 360.0, 1.0, 1.0) for h in range(360)],
+                   dtype=np.float32)
+
+# Quantized HSV -> RGB table: row ((hue * 11) + s * 10) * 64 + v * 63
+SATURATION_LEVELS = 11  # steps of 0.1
+VALUE_LEVELS = 64
+_s = np.linspace(0, 1, SATURATION_LEVELS, dtype=np.float32)[None, :, None, None]
+_v = np.linspace(0, 1, VALUE_LEVELS, dtype=np.float32)[None, None, :, None]
+RGB_LUT = ((_v * (1 - _s) + _v * _s * HUE_RGB[:, None, None, :]) * 255 + 0.5).astype(np.uint8)
+RGB_LUT = RGB_LUT.reshape(-1, 3)
+RGB_LUT_BYTES = RGB_LUT.tobytes()  # flat copy for fast scalar lookups
+del _s, _v
+
+
+def lorenz_step(x, y, z, dt=LORENZ_DT, sigma=LORENZ_SIGMA, rho=LORENZ_RHO, beta=LORENZ_BETA):
+    """Advance the Lorenz system by one Euler step"""
+    return (x + sigma * (y - x) * dt,
+            y + (x * (rho - z) - y) * dt,
+            z + (x * y - beta * z) * dt)
+
+
+# Hue width of each color bucket along the strange attractor trail
+ATTRACTOR_HUE_STEP = 360 / 16
+
+# Unit corners of an unrotated square (quarter turns from the +x axis)
+SQUARE_CORNERS = np.array([[math.cos(j * math.pi / 2), math.sin(j * math.pi / 2)]
+                           for j in range(4)])
+
+# Per-particle arrays, kept compacted so only live particles are stored
+PARTICLE_FIELDS = ('particle_x', 'particle_y', 'particle_vx', 'particle_vy',
+                   'particle_size', 'particle_hue', 'particle_life', 'particle_decay')
+
+
 class ChaosEffect:
     def __init__(self, width, height):
         self.width = width
         self.height = height
         self.time = 0
         
-        # Particle system
-        self.particles = []
+        # Particle system (one array per field, live particles only)
         self.max_particles = 200
+        for name in PARTICLE_FIELDS:
+            setattr(self, name, np.zeros(0))
         
         # Fractal parameters
         self.fractal_depth = 0
         self.fractal_angle = 0
         
         # Strange attractor state
-        self.attractor_points = []
+        self.attractor_points = deque(maxlen=500)
         self.attractor_x = 0.1
         self.attractor_y = 0.0
         self.attractor_z = 0.0
         
-        # Voronoi points
-        self.voronoi_points = []
+        # Voronoi points (one array per field)
+        self.voronoi_count = 12
+        self.voronoi_step = 20
+        self.voronoi_grid = None  # (size, gx, gy, column cell index), rebuilt on resize
         self.regenerate_voronoi()
         
         # Lissajous parameters
         self.lissajous_a = 3
         self.lissajous_b = 4
         self.lissajous_delta = 0
+        self.lissajous_t = np.radians(np.arange(0, 360, 2))
         
         # Kaleidoscope
         self.kaleidoscope_segments = 8
@@ -46,37 +92,46 @@ class ChaosEffect:
     
     def spawn_particles(self, count):
         """Spawn new particles"""
-        for _ in range(count):
-            if len(self.particles) < self.max_particles:
-                particle = {
-                    'x': random.uniform(0, self.width),
-                    'y': random.uniform(0, self.height),
-                    'vx': random.uniform(-3, 3),
-                    'vy': random.uniform(-3, 3),
-                    'size': random.uniform(2, 8),
-                    'hue': random.uniform(0, 360),
-                    'life': 1.0,
-                    'decay': random.uniform(0.003, 0.01)
-                }
-                self.particles.append(particle)
+        count = min(count, self.max_particles - len(self.particle_x))
+        if count <= 0:
+            return
+        
+        # Append new particles after the live ones
+        new = {
+            'particle_x': np.random.uniform(0, self.width, count),
+            'particle_y': np.random.uniform(0, self.height, count),
+            'particle_vx': np.random.uniform(-3, 3, count),
+            'particle_vy': np.random.uniform(-3, 3, count),
+            'particle_size': np.random.uniform(2, 8, count),
+            'particle_hue': np.random.uniform(0, 360, count),
+            'particle_life': np.ones(count),
+            'particle_decay': np.random.uniform(0.003, 0.01, count),
+        }
+        for name in PARTICLE_FIELDS:
+            setattr(self, name, np.concatenate([getattr(self, name), new[name]]))
     
     def regenerate_voronoi(self):
         """Generate new Voronoi points"""
-        self.voronoi_points = []
-        for _ in range(12):
-            self.voronoi_points.append({
-                'x': random.uniform(0, self.width),
-                'y': random.uniform(0, self.height),
-                'hue': random.uniform(0, 360),
-                'vx': random.uniform(-2, 2),
-                'vy': random.uniform(-2, 2)
-            })
+        count = self.voronoi_count
+        self.voronoi_x = np.random.uniform(0, self.width, count)
+        self.voronoi_y = np.random.uniform(0, self.height, count)
+        self.voronoi_hue = np.random.uniform(0, 360, count)
+        self.voronoi_vx = np.random.uniform(-2, 2, count)
+        self.voronoi_vy = np.random.uniform(-2, 2, count)
     
     def hsv_to_rgb(self, h, s, v):
         """Convert HSV to RGB"""
-        import colorsys
-        r, g, b = colorsys.hsv_to_rgb(h / 360.0, s, v)
-        return (int(r * 255), int(g * 255), int(b * 255))
+        row = ((int(h) % 360 * SATURATION_LEVELS + int(s * 10 + 0.5)) * VALUE_LEVELS
+               + min(int(v * (VALUE_LEVELS - 1) + 0.5), VALUE_LEVELS - 1))
+        return tuple(RGB_LUT_BYTES[row * 3:row * 3 + 3])
+    
+    def hsv_to_rgb_array(self, h, s, v):
+        """Convert arrays of HSV values to an (..., 3) uint8 RGB array"""
+        v_idx = np.minimum((np.asarray(v) * (VALUE_LEVELS - 1) + 0.5).astype(np.intp),
+                           VALUE_LEVELS - 1)
+        hue_idx = np.asarray(h).astype(np.intp) % 360
+        rows = (hue_idx * SATURATION_LEVELS + int(s * 10 + 0.5)) * VALUE_LEVELS + v_idx
+        return RGB_LUT.take(rows, axis=0)
     
     def update(self):
         """Update all chaos systems"""
@@ -86,81 +141,69 @@ class ChaosEffect:
         center_x = self.width / 2
         center_y = self.height / 2
         
-        for particle in self.particles[:]:
-            # Apply attraction to center with oscillation
-            dx = center_x - particle['x']
-            dy = center_y - particle['y']
-            dist = math.sqrt(dx * dx + dy * dy) + 0.1
-            
-            # Oscillating force field
-            force = math.sin(self.time * 0.05 + dist * 0.02) * 0.5
-            particle['vx'] += (dx / dist) * force
-            particle['vy'] += (dy / dist) * force
-            
-            # Rotational force
-            angle = math.atan2(dy, dx) + math.pi / 2
-            particle['vx'] += math.cos(angle) * 0.3
-            particle['vy'] += math.sin(angle) * 0.3
-            
-            # Apply velocity with damping
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['vx'] *= 0.98
-            particle['vy'] *= 0.98
-            
-            # Wrap around screen
-            particle['x'] %= self.width
-            particle['y'] %= self.height
-            
-            # Color cycle
-            particle['hue'] = (particle['hue'] + 1) % 360
-            
-            # Life decay
-            particle['life'] -= particle['decay']
-            if particle['life'] <= 0:
-                self.particles.remove(particle)
+        # Apply attraction to center with oscillation
+        dx = center_x - self.particle_x
+        dy = center_y - self.particle_y
+        dist = np.sqrt(dx * dx + dy * dy) + 0.1
+        
+        # Oscillating force field
+        force = np.sin(self.time * 0.05 + dist * 0.02) * 0.5
+        self.particle_vx += (dx / dist) * force
+        self.particle_vy += (dy / dist) * force
+        
+        # Rotational force
+        angle = np.arctan2(dy, dx) + math.pi / 2
+        self.particle_vx += np.cos(angle) * 0.3
+        self.particle_vy += np.sin(angle) * 0.3
+        
+        # Apply velocity with damping
+        self.particle_x += self.particle_vx
+        self.particle_y += self.particle_vy
+        self.particle_vx *= 0.98
+        self.particle_vy *= 0.98
+        
+        # Wrap around screen
+        self.particle_x %= self.width
+        self.particle_y %= self.height
+        
+        # Color cycle
+        self.particle_hue = (self.particle_hue + 1) % 360
+        
+        # Life decay
+        self.particle_life -= self.particle_decay
+        
+        # Drop dead particles in one pass
+        alive = self.particle_life > 0
+        if not alive.all():
+            for name in PARTICLE_FIELDS:
+                setattr(self, name, getattr(self, name)[alive])
         
         # Spawn new particles
-        if len(self.particles) < self.max_particles and self.time % 3 == 0:
+        if len(self.particle_x) < self.max_particles and self.time % 3 == 0:
             self.spawn_particles(2)
         
         # Update strange attractor (Lorenz system)
-        dt = 0.01
-        sigma = 10.0
-        rho = 28.0
-        beta = 8.0 / 3.0
-        
-        dx = sigma * (self.attractor_y - self.attractor_x) * dt
-        dy = (self.attractor_x * (rho - self.attractor_z) - self.attractor_y) * dt
-        dz = (self.attractor_x * self.attractor_y - beta * self.attractor_z) * dt
-        
-        self.attractor_x += dx
-        self.attractor_y += dy
-        self.attractor_z += dz
+        self.attractor_x, self.attractor_y, self.attractor_z = lorenz_step(
+            self.attractor_x, self.attractor_y, self.attractor_z)
         
         # Map to screen coordinates
         screen_x = int(self.width / 2 + self.attractor_x * 10)
         screen_y = int(self.height / 2 + self.attractor_y * 10)
         
         self.attractor_points.append((screen_x, screen_y))
-        if len(self.attractor_points) > 500:
-            self.attractor_points.pop(0)
         
         # Update Voronoi points
-        for point in self.voronoi_points:
-            point['x'] += point['vx']
-            point['y'] += point['vy']
-            
-            # Bounce off edges
-            if point['x'] < 0 or point['x'] > self.width:
-                point['vx'] *= -1
-            if point['y'] < 0 or point['y'] > self.height:
-                point['vy'] *= -1
-            
-            point['x'] = max(0, min(self.width, point['x']))
-            point['y'] = max(0, min(self.height, point['y']))
-            
-            point['hue'] = (point['hue'] + 0.5) % 360
+        self.voronoi_x += self.voronoi_vx
+        self.voronoi_y += self.voronoi_vy
+        
+        # Bounce off edges
+        self.voronoi_vx[(self.voronoi_x < 0) | (self.voronoi_x > self.width)] *= -1
+        self.voronoi_vy[(self.voronoi_y < 0) | (self.voronoi_y > self.height)] *= -1
+        
+        np.clip(self.voronoi_x, 0, self.width, out=self.voronoi_x)
+        np.clip(self.voronoi_y, 0, self.height, out=self.voronoi_y)
+        
+        self.voronoi_hue = (self.voronoi_hue + 0.5) % 360
         
         # Update fractal parameters
         self.fractal_angle += 0.02
@@ -197,58 +240,78 @@ class ChaosEffect:
     
     def draw_voronoi(self, surface):
         """Draw animated Voronoi diagram"""
-        # Sample points to create Voronoi cells
-        step = 20
-        for x in range(0, self.width, step):
-            for y in range(0, self.height, step):
-                # Find closest Voronoi point
-                min_dist = float('inf')
-                closest_point = None
-                
-                for point in self.voronoi_points:
-                    dx = x - point['x']
-                    dy = y - point['y']
-                    dist = dx * dx + dy * dy
-                    if dist < min_dist:
-                        min_dist = dist
-                        closest_point = point
-                
-                if closest_point:
-                    # Color based on distance and hue
-                    intensity = min(1.0, min_dist / 50000)
-                    color = self.hsv_to_rgb(closest_point['hue'], 0.6, 0.3 + intensity * 0.3)
-                    pygame.draw.rect(surface, color, (x, y, step, step))
+        if len(self.voronoi_x) == 0:
+            return
+
+        # Sample points to create Voronoi cells; the grid only changes with the surface size
+        step = self.voronoi_step
+        width, height = surface.get_size()
+        if self.voronoi_grid is None or self.voronoi_grid[0] != (width, height):
+            self.voronoi_grid = ((width, height), np.arange(0, width, step),
+                                 np.arange(0, height, step), np.arange(width) // step)
+        _, gx, gy, column_cell = self.voronoi_grid
+        px = self.voronoi_x
+        py = self.voronoi_y
+
+        # Squared distance from every grid cell to every point, shape (nx, ny, points).
+        # The distance is separable, so square per axis and only add on the full grid
+        dx2 = (gx[:, None] - px) ** 2
+        dy2 = (gy[:, None] - py) ** 2
+        d2 = dx2[:, None, :] + dy2[None, :, :]
+        closest = d2.argmin(axis=2)
+        min_dist = np.take_along_axis(d2, closest[:, :, None], axis=2)[:, :, 0]
+
+        # Color based on distance and hue
+        intensity = np.minimum(1.0, min_dist / 50000)
+        cells = self.hsv_to_rgb_array(self.voronoi_hue[closest], 0.6, 0.3 + intensity * 0.3)
+
+        # Write the tiles straight into the surface: widen each cell to its pixel
+        # columns, then broadcast down each run of `step` rows. This skips building,
+        # scaling and blitting a full-screen intermediate surface every frame
+        columns = pygame.surfarray.map_array(surface, cells)[column_cell]
+        full_rows = height // step
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[:, :full_rows * step].reshape(width, full_rows, step)[...] = columns[:, :full_rows, None]
+        pixels[:, full_rows * step:] = columns[:, full_rows:full_rows + 1]
+        del pixels
     
     def draw_particles(self, surface):
         """Draw particle system"""
-        for particle in self.particles:
-            color = self.hsv_to_rgb(particle['hue'], 1.0, particle['life'])
-            size = int(particle['size'] * particle['life'])
-            if size > 0:
-                pygame.draw.circle(surface, color, 
-                                 (int(particle['x']), int(particle['y'])), size)
-                
-                # Draw trails
-                trail_x = int(particle['x'] - particle['vx'] * 3)
-                trail_y = int(particle['y'] - particle['vy'] * 3)
-                pygame.draw.line(surface, color, 
-                               (int(particle['x']), int(particle['y'])),
-                               (trail_x, trail_y), 2)
+        # Only particles that still cover at least one pixel get draw calls
+        sizes = (self.particle_size * self.particle_life).astype(int)
+        visible = np.flatnonzero(sizes > 0)
+        colors = self.hsv_to_rgb_array(self.particle_hue[visible], 1.0, self.particle_life[visible]).tolist()
+        centers = np.column_stack((self.particle_x[visible], self.particle_y[visible])).astype(int)
+        
+        # Trails point back along the velocity
+        trails = np.column_stack((self.particle_x[visible] - self.particle_vx[visible] * 3,
+                                  self.particle_y[visible] - self.particle_vy[visible] * 3)).astype(int)
+        
+        draw_circle = pygame.draw.circle
+        draw_line = pygame.draw.line
+        for color, size, center, trail in zip(colors, sizes[visible].tolist(),
+                                              centers.tolist(), trails.tolist()):
+            draw_circle(surface, color, center, size)
+            draw_line(surface, color, center, trail, 2)
     
     def draw_strange_attractor(self, surface):
         """Draw Lorenz strange attractor"""
-        if len(self.attractor_points) > 1:
-            for i in range(len(self.attractor_points) - 1):
-                hue = (i * 2 + self.time) % 360
-                color = self.hsv_to_rgb(hue, 0.8, 0.8)
-                alpha = int(255 * (i / len(self.attractor_points)))
-                
-                try:
-                    pygame.draw.line(surface, color, 
-                                   self.attractor_points[i], 
-                                   self.attractor_points[i + 1], 2)
-                except:
-                    pass
+        # Snapshot once; indexing into the middle of a deque is O(n)
+        points = list(self.attractor_points)
+        if len(points) < 2:
+            return
+        
+        # Segment i has hue (2i + time); group runs of segments into 16 hue
+        # buckets and draw each run as one polyline in the bucket's color
+        hues = (np.arange(len(points) - 1) * 2 + self.time) % 360
+        buckets = (hues // ATTRACTOR_HUE_STEP).astype(int)
+        run_starts = [0] + (np.flatnonzero(np.diff(buckets)) + 1).tolist()
+        run_ends = run_starts[1:] + [len(buckets)]
+        
+        for start, end in zip(run_starts, run_ends):
+            hue = (buckets[start] + 0.5) * ATTRACTOR_HUE_STEP
+            color = self.hsv_to_rgb(hue, 0.8, 0.8)
+            pygame.draw.lines(surface, color, False, points[start:end + 1], 2)
     
     def draw_fractals(self, surface):
         """Draw recursive fractal patterns"""
@@ -260,71 +323,69 @@ class ChaosEffect:
                                     150, self.fractal_angle, self.fractal_depth)
     
     def draw_recursive_triangle(self, surface, x, y, size, angle, depth):
-        """Draw recursive triangular pattern"""
-        if depth <= 0 or size < 5:
-            return
-        
-        hue = (depth * 60 + self.time * 2) % 360
-        color = self.hsv_to_rgb(hue, 0.8, 0.9)
-        
-        # Draw triangle points
-        points = []
-        for i in range(3):
-            angle_rad = angle + i * (2 * math.pi / 3)
-            px = x + math.cos(angle_rad) * size
-            py = y + math.sin(angle_rad) * size
-            points.append((px, py))
-        
-        if len(points) == 3:
-            pygame.draw.polygon(surface, color, points, 2)
-        
-        # Recurse
-        for px, py in points:
-            self.draw_recursive_triangle(surface, px, py, size * 0.5, 
-                                        angle + 0.1, depth - 1)
+        """Draw recursive triangular pattern, one level at a time"""
+        third = 2 * math.pi / 3
+        centers = [(x, y)]
+        
+        while depth > 0 and size >= 5:
+            # Every triangle on a level shares its color and orientation
+            hue = (depth * 60 + self.time * 2) % 360
+            color = self.hsv_to_rgb(hue, 0.8, 0.9)
+            offsets = [(math.cos(angle + i * third) * size, math.sin(angle + i * third) * size)
+                       for i in range(3)]
+            
+            # Each triangle's corners become the next level's centers
+            corners = []
+            for cx, cy in centers:
+                points = [(cx + ox, cy + oy) for ox, oy in offsets]
+                pygame.draw.polygon(surface, color, points, 2)
+                corners.extend(points)
+            
+            centers = corners
+            size *= 0.5
+            angle += 0.1
+            depth -= 1
     
     def draw_lissajous(self, surface):
         """Draw Lissajous curves"""
-        points = []
-        for t in range(0, 360, 2):
-            t_rad = math.radians(t)
-            x = self.width / 2 + 150 * math.sin(self.lissajous_a * t_rad + self.lissajous_delta)
-            y = self.height / 2 + 150 * math.sin(self.lissajous_b * t_rad)
-            points.append((x, y))
-        
-        if len(points) > 1:
-            for i in range(len(points) - 1):
-                hue = (i * 2 + self.time) % 360
-                color = self.hsv_to_rgb(hue, 0.9, 0.7)
-                pygame.draw.line(surface, color, points[i], points[i + 1], 3)
+        xs = self.width / 2 + 150 * np.sin(self.lissajous_a * self.lissajous_t + self.lissajous_delta)
+        ys = self.height / 2 + 150 * np.sin(self.lissajous_b * self.lissajous_t)
+        points = np.column_stack([xs, ys]).tolist()
+        
+        # Draw the gradient as a dozen polylines rather than one line per segment
+        segments_per_color = 15
+        for start in range(0, len(points) - 1, segments_per_color):
+            hue = (start * 2 + self.time) % 360
+            color = self.hsv_to_rgb(hue, 0.9, 0.7)
+            pygame.draw.lines(surface, color, False,
+                              points[start:start + segments_per_color + 1], 3)
     
     def draw_geometric_chaos(self, surface):
         """Draw chaotic geometric patterns"""
-        # Rotating squares/diamonds
+        # Rotating squares/diamonds, all eight evaluated at once
         center_x = self.width / 2
         center_y = self.height / 2
-        
-        for i in range(8):
-            angle = self.time * 0.02 + i * math.pi / 4
-            distance = 100 + 50 * math.sin(self.time * 0.03 + i)
-            
-            x = center_x + math.cos(angle) * distance
-            y = center_y + math.sin(angle) * distance
-            
-            size = 30 + 20 * math.sin(self.time * 0.05 + i)
-            rotation = self.time * 0.05 + i
-            
-            hue = (i * 45 + self.time) % 360
-            color = self.hsv_to_rgb(hue, 0.9, 0.8)
-            
-            # Draw rotated square
-            points = []
-            for j in range(4):
-                corner_angle = rotation + j * math.pi / 2
-                px = x + math.cos(corner_angle) * size
-                py = y + math.sin(corner_angle) * size
-                points.append((px, py))
-            
+        i = np.arange(8)
+        
+        angles = self.time * 0.02 + i * (math.pi / 4)
+        distances = 100 + 50 * np.sin(self.time * 0.03 + i)
+        xs = center_x + np.cos(angles) * distances
+        ys = center_y + np.sin(angles) * distances
+        
+        sizes = 30 + 20 * np.sin(self.time * 0.05 + i)
+        rotations = self.time * 0.05 + i
+        colors = self.hsv_to_rgb_array((i * 45 + self.time) % 360, 0.9, 0.8).tolist()
+        
+        # Corners of each rotated square as an (8, 4, 2) array: rotate the fixed
+        # unit corners by each square's rotation matrix, then scale and offset
+        cos_r = np.cos(rotations)
+        sin_r = np.sin(rotations)
+        rotation_matrices = np.stack([np.stack([cos_r, -sin_r], axis=-1),
+                                      np.stack([sin_r, cos_r], axis=-1)], axis=-2)
+        corners = (SQUARE_CORNERS @ rotation_matrices.transpose(0, 2, 1) * sizes[:, None, None]
+                   + np.stack([xs, ys], axis=-1)[:, None, :])
+        
+        for color, points in zip(colors, corners.tolist()):
             pygame.draw.polygon(surface, color, points, 2)
     
     def draw_kaleidoscope(self, surface):
@@ -332,22 +393,23 @@ class ChaosEffect:
         # This is just adding some radial symmetry overlays
         center_x = self.width / 2
         center_y = self.height / 2
+        segments = self.kaleidoscope_segments
+        seg = np.arange(segments)
         
-        for seg in range(self.kaleidoscope_segments):
-            angle = seg * (2 * math.pi / self.kaleidoscope_segments)
-            
-            # Draw radial lines with oscillating length
-            length = 200 + 100 * math.sin(self.time * 0.03 + seg)
-            end_x = center_x + math.cos(angle + self.time * 0.01) * length
-            end_y = center_y + math.sin(angle + self.time * 0.01) * length
-            
-            hue = (seg * (360 / self.kaleidoscope_segments) + self.time * 2) % 360
-            color = self.hsv_to_rgb(hue, 0.8, 0.6)
-            
+        # Radial lines with oscillating length
+        angles = seg * (2 * math.pi / segments) + self.time * 0.01
+        lengths = 200 + 100 * np.sin(self.time * 0.03 + seg)
+        end_xs = (center_x + np.cos(angles) * lengths).tolist()
+        end_ys = (center_y + np.sin(angles) * lengths).tolist()
+        
+        hues = (seg * (360 / segments) + self.time * 2) % 360
+        colors = self.hsv_to_rgb_array(hues, 0.8, 0.6).tolist()
+        radius = int(10 + 5 * math.sin(self.time * 0.1))
+        
+        for color, end_x, end_y in zip(colors, end_xs, end_ys):
             pygame.draw.line(surface, color, (center_x, center_y), 
                            (end_x, end_y), 4)
             
             # Draw circles at endpoints
-            pygame.draw.circle(surface, color, (int(end_x), int(end_y)), 
-                             int(10 + 5 * math.sin(self.time * 0.1)))
+            pygame.draw.circle(surface, color, (int(end_x), int(end_y)), radius)
 
@@ -6,25 +6,139 @@ Creates an ever-changing, never-repeating techno experience
 
 import pygame
 import numpy as np
-from pydub import AudioSegment
 import mido
 import math
 import random
 import time
 import wave
 import os
-from collections import defaultdict
+import hashlib
+import pickle
+import tempfile
+from functools import lru_cache
 from pathlib import Path
+from array import array
 import threading
 import queue
-import io
-import pyaudio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Import our synthesizers from track02
-from track02 import Synthesizer, DrumMachine, midi_to_freq
+from track02 import Synthesizer, DrumMachine, MIDI_FREQ, to_segment, apply_gain
 
 # Import the chaos effect visualizer
-from chaos_effect import ChaosEffect
+from chaos_effect import ChaosEffect, SQUARE_CORNERS
+
+# Analyzed pattern libraries, keyed by a fingerprint of the reference MIDIs.
+# Bump the version when parsing or categorizing changes what gets stored
+PATTERN_CACHE_DIR = Path.home() / '.cache' / 'sm_infinite'
+PATTERN_CACHE_VERSION = 1
+
+# One record per parsed note_on event
+NOTE_DTYPE = np.dtype([('note', 'i2'), ('velocity', 'i2'), ('time', 'i8'), ('channel', 'i2')])
+
+
+def note_stats(note_values):
+    """Average pitch and pitch range of an int array of MIDI notes"""
+    return note_values.mean(), int(np.ptp(note_values))
+
+
+# Data bytes after each channel message status (by high nibble) and system status byte
+CHANNEL_DATA_LENGTHS = {0x8: 2, 0x9: 2, 0xA: 2, 0xB: 2, 0xC: 1, 0xD: 1, 0xE: 2}
+SYSTEM_DATA_LENGTHS = {0xF1: 1, 0xF2: 2, 0xF3: 1, 0xF6: 0, 0xF8: 0, 0xFA: 0,
+                       0xFB: 0, 0xFC: 0, 0xFE: 0}
+
+
+def read_variable_int(data, pos):
+    """Read a MIDI variable-length quantity, returning (value, next position)"""
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, pos
+
+
+def extract_midi_tracks(midi_path):
+    """Parse one MIDI file into (note events, track name, bpm) for each track with notes"""
+    # Only note_on, set_tempo and track_name matter here, so scan the raw
+    # bytes instead of letting mido decode and validate a Message per event
+    with open(midi_path, 'rb') as f:
+        data = f.read()
+    
+    if data[:4] != b'MThd':
+        raise OSError('MThd not found. Probably not a MIDI file')
+    num_tracks = int.from_bytes(data[10:12], 'big')
+    pos = 8 + int.from_bytes(data[4:8], 'big')
+    tracks = []
+    
+    for _ in range(num_tracks):
+        if data[pos:pos + 4] != b'MTrk':
+            raise OSError('no MTrk header at start of track')
+        end = pos + 8 + int.from_bytes(data[pos + 4:pos + 8], 'big')
+        pos += 8
+        
+        # One typed array per field instead of a tuple per note
+        note_nums = array('B')
+        velocities = array('B')
+        times = array('q')
+        channels = array('B')
+        track_name = None
+        last_status = None
+        time = 0
+        tempo = 500000
+        
+        while pos < end:
+            delta, pos = read_variable_int(data, pos)
+            time += delta
+            
+            status = data[pos]
+            if status < 0x80:
+                # Running status - this byte is already the first data byte
+                if last_status is None:
+                    raise OSError('running status without last_status')
+                status = last_status
+            else:
+                pos += 1
+                if status != 0xFF:  # Meta events don't set running status
+                    last_status = status
+            
+            if status & 0xF0 == 0x90:  # note_on
+                velocity = data[pos + 1]
+                if velocity > 0:
+                    note_nums.append(data[pos])
+                    velocities.append(velocity)
+                    times.append(time)
+                    channels.append(status & 0x0F)
+                pos += 2
+            elif status < 0xF0:
+                pos += CHANNEL_DATA_LENGTHS[status >> 4]
+            elif status == 0xFF:
+                meta_type = data[pos]
+                length, pos = read_variable_int(data, pos + 1)
+                if meta_type == 0x51:  # set_tempo
+                    tempo = int.from_bytes(data[pos:pos + 3], 'big')
+                elif meta_type == 0x03 and track_name is None:
+                    track_name = data[pos:pos + length].decode('latin1')
+                pos += length
+            elif status in (0xF0, 0xF7):  # sysex
+                length, pos = read_variable_int(data, pos)
+                pos += length
+            else:
+                pos += SYSTEM_DATA_LENGTHS[status]
+        
+        pos = end
+        
+        if note_nums:
+            notes = np.empty(len(note_nums), dtype=NOTE_DTYPE)
+            notes['note'] = note_nums
+            notes['velocity'] = velocities
+            notes['time'] = times
+            notes['channel'] = channels
+            tracks.append((notes, track_name or '', mido.tempo2bpm(tempo)))
+    
+    return tracks
 
 
 class MIDIPatternAnalyzer:
@@ -47,36 +161,80 @@ class MIDIPatternAnalyzer:
         
         midi_files = list(Path(self.reference_dir).glob('*.mid'))
         
-        for midi_path in midi_files:
-            print(f"   Analyzing: {midi_path.name}")
-            try:
-                mid = mido.MidiFile(str(midi_path))
-                source_name = midi_path.stem
-                
-                for track_idx, track in enumerate(mid.tracks):
-                    notes = []
-                    time = 0
-                    tempo = 500000
-                    
-                    for msg in track:
-                        time += msg.time
-                        if msg.type == 'set_tempo':
-                            tempo = msg.tempo
-                        if msg.type == 'note_on' and msg.velocity > 0:
-                            notes.append({
-                                'note': msg.note,
-                                'velocity': msg.velocity,
-                                'time': time,
-                                'channel': msg.channel
-                            })
-                    
-                    if notes:
-                        bpm = mido.tempo2bpm(tempo)
-                        self.categorize_pattern(notes, source_name, track.name, bpm)
-                        
-            except Exception as e:
-                print(f"   ⚠️  Skipped {midi_path.name}: {e}")
+        # The library only depends on the files, so reuse the last run's if
+        # none of them were added, removed or touched since
+        cache_file = self.pattern_cache_file(midi_files)
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            cached = None  # Missing, corrupt or foreign cache: parse again
+        
+        # Only trust a cache shaped like the library: the same pattern lists
+        if (isinstance(cached, dict) and cached.keys() == self.patterns.keys()
+                and all(isinstance(patterns, list) for patterns in cached.values())):
+            self.patterns = cached
+            print(f"   Loaded from cache: {cache_file}")
+            self.print_library()
+            return
         
+        # Parsing is pure Python and CPU-bound, so spread the files over worker
+        # processes (threads would serialize on the GIL). Categorizing appends
+        # to the shared pattern lists, so it stays here, in file order
+        with ProcessPoolExecutor() as executor:
+            futures = [executor.submit(extract_midi_tracks, midi_path) for midi_path in midi_files]
+            
+            for midi_path, future in zip(midi_files, futures):
+                print(f"   Analyzing: {midi_path.name}")
+                try:
+                    source_name = midi_path.stem
+                    for notes, track_name, bpm in future.result():
+                        self.categorize_pattern(notes, source_name, track_name, bpm)
+                        
+                except Exception as e:
+                    print(f"   ⚠️  Skipped {midi_path.name}: {e}")
+        
+        # Write to a temp file of this run's own first, so a killed run never
+        # leaves half a cache and runs started together never share one
+        temp_name = None
+        try:
+            PATTERN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=PATTERN_CACHE_DIR, prefix='patterns_',
+                                             suffix='.tmp', delete=False) as f:
+                temp_name = f.name
+                pickle.dump(self.patterns, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, cache_file)
+            temp_name = None
+            
+            # Caches for older versions of the reference files can't match again
+            for stale_file in PATTERN_CACHE_DIR.glob('patterns_*.pkl'):
+                if stale_file != cache_file:
+                    stale_file.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"   ⚠️  Could not cache patterns: {e}")
+        finally:
+            if temp_name is not None:
+                try:
+                    os.unlink(temp_name)
+                except OSError:
+                    pass
+        
+        self.print_library()
+    
+    def pattern_cache_file(self, midi_files):
+        """Cache path named by a hash of each MIDI file's name, size and mtime"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(PATTERN_CACHE_VERSION.to_bytes(4, 'little'))
+        # Analysis appends in file order, so the order is part of the key too
+        for midi_path in midi_files:
+            stat = midi_path.stat()
+            h.update(midi_path.name.encode())
+            h.update(stat.st_size.to_bytes(8, 'little'))
+            h.update(stat.st_mtime_ns.to_bytes(8, 'little'))
+        return PATTERN_CACHE_DIR / f"patterns_{h.hexdigest()}.pkl"
+    
+    def print_library(self):
+        """Print how many patterns of each kind were found"""
         print(f"\n✅ Pattern Library Built:")
         print(f"   Bass patterns: {len(self.patterns['bass'])}")
         print(f"   Melodies: {len(self.patterns['melody'])}")
@@ -86,16 +244,18 @@ class MIDIPatternAnalyzer:
     
     def categorize_pattern(self, notes, source, track_name, bpm):
         """Categorize notes into different pattern types"""
-        if not notes:
+        if not len(notes):
             return
         
-        avg_note = sum(n['note'] for n in notes) / len(notes)
-        note_range = max(n['note'] for n in notes) - min(n['note'] for n in notes)
-        note_density = len(notes) / (notes[-1]['time'] + 1)
+        # notes is a NOTE_DTYPE array, so the aggregates are single NumPy passes
+        avg_note, note_range = note_stats(notes['note'])
+        note_density = len(notes) / (int(notes['time'][-1]) + 1)
+        events = notes[:32].copy()  # First 32 notes, not a view pinning the whole track
         
         pattern = {
-            'notes': [n['note'] for n in notes[:32]],  # Take first 32 notes
-            'velocities': [n['velocity'] for n in notes[:32]],
+            'events': events,
+            'notes': events['note'].astype(np.int8),
+            'velocities': events['velocity'].tolist(),
             'source': source,
             'track': track_name,
             'bpm': bpm,
@@ -118,22 +278,28 @@ class MIDIPatternAnalyzer:
 class AudioEffects:
     """Audio effects processor"""
     
+    @staticmethod
+    def apply_taps(audio, taps):
+        """Mix delayed copies of audio into itself in one pass (a sparse FIR filter)"""
+        samples = np.frombuffer(audio.raw_data, dtype=np.int16)
+        result = samples.astype(np.float32)
+        for delay_ms, attenuation_db in taps:
+            offset = int(delay_ms * audio.frame_rate / 1000) * audio.channels
+            if offset < len(samples):
+                result[offset:] += samples[:len(samples) - offset] * 10 ** (-attenuation_db / 20)
+        return audio._spawn(np.clip(result, -32768, 32767).astype(np.int16).tobytes())
+    
     @staticmethod
     def delay(audio, delay_ms=250, feedback=0.4, mix=0.3):
         """Simple delay effect"""
-        delayed = audio - (1000 * mix)  # Quieter
-        result = audio.overlay(delayed, position=delay_ms)
-        return result
+        return AudioEffects.apply_taps(audio, [(delay_ms, 1000 * mix)])  # Quieter
     
     @staticmethod
     def reverb(audio, mix=0.2):
         """Simple reverb simulation using multiple delays"""
-        result = audio
         delays = [50, 80, 120, 180, 250]
-        for i, d in enumerate(delays):
-            decay = mix * (0.8 ** i)
-            result = result.overlay(audio - (decay * 30 * 1000), position=d)
-        return result
+        return AudioEffects.apply_taps(audio, [(d, mix * (0.8 ** i) * 30 * 1000)
+                                               for i, d in enumerate(delays)])
     
     @staticmethod
     def filter_lowpass(audio, cutoff_ratio=0.7):
@@ -147,14 +313,69 @@ class AudioEffects:
         return (audio + (gain - 1) * 6).normalize(headroom=2.0)
 
 
+# Supporting melody voices, brass listed twice so it plays half the time
+MELODY_VOICES = ('brass', 'xylo', 'acid', 'brass')
+
+# Slots of the per-bar uniform draw, one per random decision in generate_bar
+HIHAT_GATES = slice(0, 16)
+STEP_GATES = slice(16, 32)
+ARP_GATES = slice(32, 48)
+MELODY_GATE = 48
+ARP_GATE = 49
+KICK_PUNCHES = slice(50, 54)
+SNARE_TAKES = slice(54, 56)
+HIHAT_TAKES = slice(56, 72)
+MELODY_STEPS = 72
+MELODY_VOICE_SLOTS = slice(73, 89)
+BAR_DRAWS = 89
+
+
+class MixBuffer:
+    """Sums mono 16-bit voices into one int32 buffer instead of chained overlays"""
+    
+    def __init__(self, duration_ms, sample_rate=44100):
+        self.sample_rate = sample_rate
+        self.samples = np.zeros(int(duration_ms * sample_rate / 1000), dtype=np.int32)
+    
+    def add(self, audio, position=0, gain_db=0):
+        """Mix an AudioSegment in at position (ms) and gain_db, cut off at the end of the buffer"""
+        start = int(position * self.sample_rate / 1000)
+        if start >= len(self.samples):
+            return
+        samples = np.frombuffer(audio.raw_data, dtype=np.int16)
+        samples = samples[:len(self.samples) - start]
+        if gain_db:
+            samples = apply_gain(samples, gain_db)
+        self.add_samples(samples, position)
+    
+    def add_samples(self, samples, position=0):
+        """Mix already-gained int16 samples in at position (ms), cut off at the end of the buffer"""
+        start = int(position * self.sample_rate / 1000)
+        end = min(start + len(samples), len(self.samples))
+        if start < end:
+            self.samples[start:end] += samples[:end - start]
+    
+    def to_pcm(self, headroom=None):
+        """Clip to 16-bit, optionally peak-normalize to headroom dB, and return raw mono PCM"""
+        clipped = np.clip(self.samples, -32768, 32767)
+        if headroom is not None:
+            # Same boost as AudioSegment.normalize, but one pass over the array
+            peak = int(np.abs(clipped).max())
+            if peak:
+                boost_db = 20 * math.log(32768 * 10 ** (-headroom / 20) / peak, 10)
+                clipped = np.floor(np.clip(clipped * 10 ** (boost_db / 20), -32768, 32767))
+        return clipped.astype(np.int16).tobytes()
+
+
 class PatternMixer:
     """Randomly mixes patterns to create evolving music"""
     
-    def __init__(self, pattern_analyzer, synth, drums, bpm=128):
+    def __init__(self, pattern_analyzer, synth, drums, bpm=128, seed=None):
         self.patterns = pattern_analyzer.patterns
         self.synth = synth
         self.drums = drums
         self.bpm = bpm
+        self.rng = np.random.default_rng(seed)  # Per-bar note decisions, seedable
         self.beat_duration = 60000 / bpm
         self.bar_duration = self.beat_duration * 4
         
@@ -177,6 +398,86 @@ class PatternMixer:
         self.current_section = 'intro'
         self.section_bar_counter = 0
         
+        # Note positions within a bar (ms), computed once instead of every bar
+        self.beat_positions = [int(beat * self.beat_duration) for beat in range(4)]
+        self.sixteenth_positions = [int(sixteenth * self.beat_duration / 4) for sixteenth in range(16)]
+        self.step_positions = {num_steps: [int(step * (self.bar_duration / num_steps))
+                                           for step in range(num_steps)]
+                               for num_steps in (8, 16)}
+        self.step_offsets = {num_steps: np.arange(num_steps) for num_steps in (4, 8, 16)}
+        self.hihat_closed = [sixteenth % 4 != 3 for sixteenth in range(16)]  # Open on the "a"
+        
+        # Pre-rendered drum hits. Kicks cover the punch range in small steps;
+        # snares and hats are noise, so keep a few takes of each to stay varied
+        self.kick_punches = np.linspace(1.1, 1.7, 13)
+        kicks = [self.drums.kick(punch=punch) for punch in self.kick_punches]
+        snares = [self.drums.snare() for _ in range(8)]
+        hihats = {closed: [self.drums.hihat(closed=closed) for _ in range(8)]
+                  for closed in (True, False)}
+        
+        # Drum gains only depend on chorus or not, so the banks hold int16 hits
+        # already at their mix level, keyed by is_chorus where it matters
+        def gained(hits, gain_db):
+            return [apply_gain(hit, gain_db) for hit in hits]
+        
+        self.kick_bank = {chorus: gained(kicks, 3 if chorus else 2) for chorus in (True, False)}
+        self.snare_bank = {chorus: gained(snares, 1 if chorus else 0) for chorus in (True, False)}
+        self.hihat_bank = {closed: gained(hits, -2) for closed, hits in hihats.items()}
+    
+    @lru_cache(maxsize=2048)
+    def render_voice(self, voice, frequency, duration_ms, **params):
+        """Render a synth voice, reusing the previous render of the same note"""
+        # Patterns cycle through the same few notes, and the synths are deterministic;
+        # they render int16 samples, wrapped here for the pydub effects
+        samples = getattr(self.synth, voice)(frequency, duration_ms, **params)
+        return to_segment(samples, self.synth.sample_rate)
+    
+    @lru_cache(maxsize=2048)
+    def render_lead_step(self, lead_freq, num_steps, effect):
+        """Render a finished chorus lead note for one step of a num_steps bar"""
+        step_duration = self.bar_duration / num_steps
+        
+        # Brass lead (loud and proud!), layered with a detuned second voice
+        # for thickness; both voices come out of one synth pass
+        lead = self.synth.brass_lead_stacked(lead_freq, step_duration * 0.8, velocity=100,
+                                             detune=1.01, velocity2=90, gain2_db=-2)
+        lead = to_segment(lead, self.synth.sample_rate)
+        
+        # Apply reverb for space
+        if effect == 'reverb':
+            lead = AudioEffects.reverb(lead, mix=0.3)
+        elif effect == 'delay':
+            lead = AudioEffects.delay(lead, delay_ms=int(self.beat_duration), mix=0.25)
+        return lead
+    
+    @lru_cache(maxsize=2048)
+    def render_melody_step(self, voice, melody_freq, num_steps, effect):
+        """Render a finished supporting melody note for one step of a num_steps bar"""
+        step_duration = self.bar_duration / num_steps
+        
+        if voice == 'brass':
+            melody = self.render_voice('brass_lead', melody_freq, step_duration * 0.7, velocity=85)
+        elif voice == 'xylo':
+            melody = self.render_voice('xylophone', melody_freq, step_duration * 0.5)
+        else:
+            melody = self.render_voice('acid_bass', melody_freq, step_duration * 0.6)
+        
+        if effect == 'reverb':
+            melody = AudioEffects.reverb(melody, mix=0.25)
+        elif effect == 'delay':
+            melody = AudioEffects.delay(melody, delay_ms=int(self.beat_duration), mix=0.3)
+        return melody
+    
+    @lru_cache(maxsize=64)
+    def render_pad_chord(self, pad_notes, gain_db):
+        """Mix a bar's pad notes into one int32 bar buffer at gain_db"""
+        # Pads only change with active_pad, so even bars reuse the summed chord
+        chord = MixBuffer(int(self.bar_duration), self.synth.sample_rate)
+        for pad_note in pad_notes:
+            pad = self.render_voice('creepy_pad', MIDI_FREQ[pad_note], self.bar_duration * 2)
+            chord.add(pad, position=0, gain_db=gain_db)
+        return chord.samples
+        
     def change_section(self, new_section=None):
         """Change musical section (intro, verse, chorus, breakdown)"""
         if new_section:
@@ -217,9 +518,17 @@ class PatternMixer:
         print(f"   Lead: {self.active_lead['source'] if self.active_lead else 'None'}")
         print(f"   Pad: {self.active_pad['source'] if self.active_pad else 'None'}")
     
-    def generate_bar(self, bar_num):
-        """Generate one bar of music with current patterns"""
-        bar = AudioSegment.silent(duration=int(self.bar_duration))
+    def generate_bar(self, bar_num, headroom=None):
+        """Generate one bar of music as raw 16-bit PCM, normalized if headroom is given"""
+        bar = MixBuffer(int(self.bar_duration), self.synth.sample_rate)
+        
+        # One RNG draw per bar for every decision below, consumed by slot.
+        # Hi-hat and arp hits come out as index lists, so their loops skip rests
+        chance = self.rng.random(BAR_DRAWS)
+        hihat_hits = np.flatnonzero(chance[HIHAT_GATES] > 0.1).tolist()
+        hihat_takes = (chance[HIHAT_TAKES] * len(self.hihat_bank[True])).astype(int).tolist()
+        step_chance = chance[STEP_GATES]
+        arp_hits = np.flatnonzero(chance[ARP_GATES] > 0.5).tolist()
         
         # Track section progression
         self.section_bar_counter += 1
@@ -233,23 +542,25 @@ class PatternMixer:
         
         if not (is_breakdown and bar_num % 4 < 2):  # Sometimes drop drums in breakdown
             # Kick - four on the floor
+            punches = (1.5 if is_chorus else 1.2) - 0.1 + 0.3 * chance[KICK_PUNCHES]
+            kick_idx = np.abs(self.kick_punches[:, None] - punches).argmin(axis=0).tolist()
+            kicks = self.kick_bank[is_chorus]
             for beat in range(4):
-                kick_pos = int(beat * self.beat_duration)
-                punch = (1.5 if is_chorus else 1.2) + random.uniform(-0.1, 0.2)
-                gain = 3 if is_chorus else 2
-                bar = bar.overlay(self.drums.kick(punch=punch) + gain, position=kick_pos)
+                kick_pos = self.beat_positions[beat]
+                bar.add_samples(kicks[kick_idx[beat]], position=kick_pos)
             
             # Snare on 2 and 4
-            for snare_beat in [1, 3]:
-                snare_pos = int(snare_beat * self.beat_duration)
-                bar = bar.overlay(self.drums.snare() + (1 if is_chorus else 0), position=snare_pos)
+            snares = self.snare_bank[is_chorus]
+            snare_takes = (chance[SNARE_TAKES] * len(snares)).astype(int).tolist()
+            for snare_beat, take in zip([1, 3], snare_takes):
+                snare_pos = self.beat_positions[snare_beat]
+                bar.add_samples(snares[take], position=snare_pos)
             
             # Hi-hats (16th notes)
-            for sixteenth in range(16):
-                if random.random() > 0.1:
-                    hihat_pos = int(sixteenth * self.beat_duration / 4)
-                    closed = not (sixteenth % 4 == 3)
-                    bar = bar.overlay(self.drums.hihat(closed=closed) - 2, position=hihat_pos)
+            for sixteenth in hihat_hits:
+                hihat_pos = self.sixteenth_positions[sixteenth]
+                hihat = self.hihat_bank[self.hihat_closed[sixteenth]][hihat_takes[sixteenth]]
+                bar.add_samples(hihat, position=hihat_pos)
         
         # === BASS (with slower variation) ===
         if self.active_bass:
@@ -258,15 +569,17 @@ class PatternMixer:
             # Create bass pattern variation every 4 bars
             variation_offset = (bar_num // 4) % 4
             
+            # More complex bass pattern; mode='wrap' does the per-step modulo in C
+            bar_bass = bass_notes.take(self.step_offsets[4] + (bar_num * 4 + variation_offset),
+                                       mode='wrap').tolist()
+            
             for beat in range(4):
-                # More complex bass pattern
-                note_idx = (bar_num * 4 + beat + variation_offset) % len(bass_notes)
-                bass_note = bass_notes[note_idx]
-                bass_freq = midi_to_freq(bass_note)
-                bass_pos = int(beat * self.beat_duration)
+                bass_note = bar_bass[beat]
+                bass_freq = MIDI_FREQ[bass_note]
+                bass_pos = self.beat_positions[beat]
                 
                 # Double layer bass
-                bass = self.synth.deep_bass(bass_freq, self.beat_duration * 0.9, fatness=5)
+                bass = self.render_voice('deep_bass', bass_freq, self.beat_duration * 0.9, fatness=5)
                 
                 # Apply effect
                 if self.bass_effect == 'distortion':
@@ -276,96 +589,71 @@ class PatternMixer:
                 elif self.bass_effect == 'filter':
                     bass = AudioEffects.filter_lowpass(bass, cutoff_ratio=0.6)
                 
-                bar = bar.overlay(bass - 5, position=bass_pos)
+                bar.add(bass, position=bass_pos, gain_db=-5)
                 
                 # Add sub bass on beat 1 and 3
                 if beat in [0, 2] and is_chorus:
-                    sub = self.synth.deep_bass(bass_freq / 2, self.beat_duration * 1.2, fatness=3)
-                    bar = bar.overlay(sub - 8, position=bass_pos)
+                    sub = self.render_voice('deep_bass', bass_freq / 2, self.beat_duration * 1.2, fatness=3)
+                    bar.add(sub, position=bass_pos, gain_db=-8)
         
         # === MAIN LEAD/MELODY (MUCH MORE PROMINENT!) ===
         if is_chorus and self.active_lead:
             # CHORUS - Big loud lead!
             lead_notes = self.active_lead['notes']
             num_steps = 8
+            bar_lead = lead_notes.take(self.step_offsets[num_steps] + bar_num * num_steps,
+                                       mode='wrap').tolist()
+            step_positions = self.step_positions[num_steps]
+            lead_hits = np.flatnonzero(step_chance[:num_steps] > 0.15)  # 85% note density
             
-            for step in range(num_steps):
-                if random.random() > 0.15:  # 85% note density
-                    note_idx = (bar_num * num_steps + step) % len(lead_notes)
-                    lead_note = lead_notes[note_idx]
-                    lead_freq = midi_to_freq(lead_note + 12)  # Octave up for prominence
-                    step_duration = self.bar_duration / num_steps
-                    lead_pos = int(step * step_duration)
-                    
-                    # Brass lead (loud and proud!)
-                    lead = self.synth.brass_lead(lead_freq, step_duration * 0.8, velocity=100)
-                    
-                    # Layer with second voice for thickness
-                    lead2 = self.synth.brass_lead(lead_freq * 1.01, step_duration * 0.8, velocity=90)
-                    lead = lead.overlay(lead2 - 2)
-                    
-                    # Apply reverb for space
-                    if self.melody_effect == 'reverb':
-                        lead = AudioEffects.reverb(lead, mix=0.3)
-                    elif self.melody_effect == 'delay':
-                        lead = AudioEffects.delay(lead, delay_ms=int(self.beat_duration), mix=0.25)
-                    
-                    # MUCH LOUDER - only -4dB reduction instead of -11dB!
-                    bar = bar.overlay(lead - 4, position=lead_pos)
+            for step in lead_hits.tolist():
+                lead_note = bar_lead[step]
+                lead_freq = MIDI_FREQ[min(lead_note + 12, 127)]  # Octave up for prominence
+                lead = self.render_lead_step(lead_freq, num_steps, self.melody_effect)
+                
+                # MUCH LOUDER - only -4dB reduction instead of -11dB!
+                bar.add(lead, position=step_positions[step], gain_db=-4)
         
         # === SUPPORTING MELODY (Verse/Other sections) ===
-        if not is_chorus and self.active_melody and random.random() > 0.3:
+        if not is_chorus and self.active_melody and chance[MELODY_GATE] > 0.3:
             melody_notes = self.active_melody['notes']
-            num_steps = random.choice([8, 16])
-            
-            for step in range(num_steps):
-                if random.random() > 0.4:  # Sparser
-                    note_idx = (bar_num * num_steps + step) % len(melody_notes)
-                    melody_note = melody_notes[note_idx]
-                    melody_freq = midi_to_freq(melody_note)
-                    step_duration = self.bar_duration / num_steps
-                    melody_pos = int(step * step_duration)
-                    
-                    # Vary voices
-                    voice = random.choice(['brass', 'xylo', 'acid', 'brass'])  # More brass
-                    if voice == 'brass':
-                        melody = self.synth.brass_lead(melody_freq, step_duration * 0.7, velocity=85)
-                    elif voice == 'xylo':
-                        melody = self.synth.xylophone(melody_freq, step_duration * 0.5)
-                    else:
-                        melody = self.synth.acid_bass(melody_freq, step_duration * 0.6)
-                    
-                    if self.melody_effect == 'reverb':
-                        melody = AudioEffects.reverb(melody, mix=0.25)
-                    elif self.melody_effect == 'delay':
-                        melody = AudioEffects.delay(melody, delay_ms=int(self.beat_duration), mix=0.3)
-                    
-                    bar = bar.overlay(melody - 9, position=melody_pos)
+            num_steps = 16 if chance[MELODY_STEPS] >= 0.5 else 8
+            bar_melody = melody_notes.take(self.step_offsets[num_steps] + bar_num * num_steps,
+                                           mode='wrap').tolist()
+            step_positions = self.step_positions[num_steps]
+            melody_hits = np.flatnonzero(step_chance[:num_steps] > 0.4)  # Sparser
+            
+            # Vary voices
+            voices = (chance[MELODY_VOICE_SLOTS] * len(MELODY_VOICES)).astype(int).tolist()
+            
+            for step in melody_hits.tolist():
+                melody_note = bar_melody[step]
+                melody_freq = MIDI_FREQ[melody_note]
+                voice = MELODY_VOICES[voices[step]]
+                melody = self.render_melody_step(voice, melody_freq, num_steps, self.melody_effect)
+                
+                bar.add(melody, position=step_positions[step], gain_db=-9)
         
         # === PAD (Atmosphere) ===
         if self.active_pad and bar_num % 2 == 0:
-            pad_notes = self.active_pad['notes'][:4]
-            for i, pad_note in enumerate(pad_notes):
-                pad_freq = midi_to_freq(pad_note)
-                pad = self.synth.creepy_pad(pad_freq, self.bar_duration * 2)
-                # Louder pads in chorus
-                reduction = 18 if is_chorus else 22
-                bar = bar.overlay(pad - reduction, position=0)
+            pad_notes = tuple(self.active_pad['notes'][:4].tolist())
+            # Louder pads in chorus
+            reduction = 18 if is_chorus else 22
+            bar.add_samples(self.render_pad_chord(pad_notes, -reduction), position=0)
         
         # === ARPEGGIO (Texture) ===
-        if self.active_arp and random.random() > 0.4:
+        if self.active_arp and chance[ARP_GATE] > 0.4:
             arp_notes = self.active_arp['notes']
-            for sixteenth in range(16):
-                if random.random() > 0.5:
-                    note_idx = (bar_num * 16 + sixteenth) % len(arp_notes)
-                    arp_note = arp_notes[note_idx]
-                    arp_freq = midi_to_freq(arp_note + 12)
-                    arp_pos = int(sixteenth * self.beat_duration / 4)
-                    
-                    arp = self.synth.xylophone(arp_freq, self.beat_duration * 0.15)
-                    bar = bar.overlay(arp - 13, position=arp_pos)
+            bar_arp = arp_notes.take(self.step_offsets[16] + bar_num * 16, mode='wrap').tolist()
+            for sixteenth in arp_hits:
+                arp_note = bar_arp[sixteenth]
+                arp_freq = MIDI_FREQ[min(arp_note + 12, 127)]
+                arp_pos = self.sixteenth_positions[sixteenth]
+                
+                arp = self.render_voice('xylophone', arp_freq, self.beat_duration * 0.15)
+                bar.add(arp, position=arp_pos, gain_db=-13)
         
-        return bar
+        return bar.to_pcm(headroom)
 
 
 class AudioReactiveChaos(ChaosEffect):
@@ -399,13 +687,14 @@ class AudioReactiveChaos(ChaosEffect):
         self.kaleidoscope_segments = int(6 + high * 6)
         self.lissajous_a = 3 + int(mid * 4)
         
-        # Spawn particles on bass hits
+        # Spawn particles on bass hits, plus extras on high energy, in one
+        # append to the particle arrays
+        spawn_count = 0
         if bass > 0.7:
-            self.spawn_particles(int((bass - 0.7) * 30))
-        
-        # Extra particles on high energy
+            spawn_count += int((bass - 0.7) * 30)
         if energy > 0.8:
-            self.spawn_particles(int((energy - 0.8) * 40))
+            spawn_count += int((energy - 0.8) * 40)
+        self.spawn_particles(spawn_count)
     
     def update(self):
         """Override update to include audio reactivity"""
@@ -478,33 +767,46 @@ class AudioReactiveChaos(ChaosEffect):
         
         # Number of elements responds to energy
         num_elements = int(8 + self.audio_energy * 8)
-        
-        for i in range(num_elements):
-            angle = self.time * (0.02 + self.smooth_energy * 0.03) + i * math.pi / 4
-            
-            # Distance pulses with bass
-            base_distance = 100
-            distance = base_distance + 50 * math.sin(self.time * 0.03 + i) + self.bass_energy * 80
-            
-            x = center_x + math.cos(angle) * distance
-            y = center_y + math.sin(angle) * distance
-            
-            # Size pulses with mid frequencies
-            size = 30 + 20 * math.sin(self.time * 0.05 + i) + self.mid_energy * 25
-            rotation = self.time * 0.05 + i
-            
-            hue = (i * 45 + self.time + self.audio_energy * 50) % 360
-            color = self.hsv_to_rgb(hue, 0.9, 0.7 + self.smooth_energy * 0.3)
-            
-            # Draw rotated square with audio-reactive size
-            points = []
-            for j in range(4):
-                corner_angle = rotation + j * math.pi / 2
-                px = x + math.cos(corner_angle) * size
-                py = y + math.sin(corner_angle) * size
-                points.append((px, py))
-            
-            pygame.draw.polygon(surface, color, points, max(1, int(2 + self.bass_energy * 2)))
+        i = np.arange(num_elements)
+        
+        angles = self.time * (0.02 + self.smooth_energy * 0.03) + i * (math.pi / 4)
+        
+        # Distance pulses with bass
+        base_distance = 100
+        distances = base_distance + 50 * np.sin(self.time * 0.03 + i) + self.bass_energy * 80
+        xs = center_x + np.cos(angles) * distances
+        ys = center_y + np.sin(angles) * distances
+        
+        # Size pulses with mid frequencies
+        sizes = 30 + 20 * np.sin(self.time * 0.05 + i) + self.mid_energy * 25
+        rotations = self.time * 0.05 + i
+        
+        # All element colors in one lookup table gather
+        hues = (i * 45 + self.time + self.audio_energy * 50) % 360
+        colors = self.hsv_to_rgb_array(hues, 0.9, 0.7 + self.smooth_energy * 0.3).tolist()
+        
+        # Rotated square corners as a (num_elements, 4, 2) array: rotate and
+        # scale the unit corners by each square's (cos, sin) * size
+        dx = (np.cos(rotations) * sizes)[:, None]
+        dy = (np.sin(rotations) * sizes)[:, None]
+        unit_x, unit_y = SQUARE_CORNERS[:, 0], SQUARE_CORNERS[:, 1]
+        corners = np.stack([xs[:, None] + dx * unit_x - dy * unit_y,
+                            ys[:, None] + dy * unit_x + dx * unit_y], axis=-1)
+        
+        # Draw rotated squares with audio-reactive size
+        width = max(1, int(2 + self.bass_energy * 2))
+        for color, points in zip(colors, corners.tolist()):
+            pygame.draw.polygon(surface, color, points, width)
+
+
+# Frame rates for the full visualizer and the text-only minimal mode. Audio
+# runs off the PyAudio callback, so the frame rate only sets UI smoothness
+FULL_FPS = 60
+MINIMAL_FPS = 15
+
+# PortAudio callbacks per bar: one per sixteenth note, so blocks follow the
+# hi-hat grid instead of an arbitrary 1024 frames (~80 callbacks a bar)
+BLOCKS_PER_BAR = 16
 
 
 class InfiniteGenerator:
@@ -524,7 +826,7 @@ class InfiniteGenerator:
         self.is_recording = True  # Start recording by default!
         self.should_stop = False
         self.bar_counter = 0
-        self.audio_buffer = AudioSegment.silent(duration=0)
+        self.recorded_frames = 0
         
         # File handling
         self.current_file = None
@@ -540,11 +842,22 @@ class InfiniteGenerator:
         self.screen = None
         self.visualizer = None
         self.clock = None
+        self.fonts = None
+        self.text_cache = {}
         self.minimal_mode = False  # Toggle for CPU-light mode
+        self.minimal_ui_state = None  # What the minimal mode text last showed
+        self.minimal_dirty = []  # Screen rects that text was last drawn into
         
         # PyAudio for playback
         self.pyaudio_instance = None
         self.audio_stream = None
+        self.pa_continue = None
+        
+        # Bars handed to the PyAudio callback: (memoryview of raw bytes, metadata) pairs
+        self.playback_bars = deque()
+        self.playing_data = memoryview(b'')
+        self.playing_offset = 0
+        self.now_playing = None
         
         # Audio buffer queue (producer-consumer pattern)
         self.audio_queue = queue.Queue(maxsize=8)  # Buffer up to 8 bars
@@ -567,17 +880,32 @@ class InfiniteGenerator:
         pygame.init()
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Super Metroid Infinite")
+        # Only queue the events the loops handle; mouse motion and most window
+        # events would otherwise be fetched and skipped every frame. Expose
+        # events stay, since minimal mode only repaints when told to
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+                                  pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE])
         self.clock = pygame.time.Clock()
         self.visualizer = AudioReactiveChaos(self.width, self.height)
-        
-        # Initialize PyAudio for playback
+        # Load the UI fonts once instead of every frame
+        self.fonts = {size: pygame.font.Font(None, size) for size in (20, 24, 32)}
+        
+        # Initialize PyAudio for playback. PortAudio pulls audio through the
+        # callback, so visualizer stalls no longer starve the device. Imported
+        # here so analysis (and spawned analyzer workers) never load PortAudio
+        import pyaudio
+        self.pa_continue = pyaudio.paContinue
         self.pyaudio_instance = pyaudio.PyAudio()
+        samples_per_bar = int(int(self.mixer.bar_duration) * self.synth.sample_rate / 1000)
         self.audio_stream = self.pyaudio_instance.open(
             format=pyaudio.paInt16,
             channels=1,
-            rate=44100,
+            rate=self.synth.sample_rate,
             output=True,
-            frames_per_buffer=1024
+            frames_per_buffer=samples_per_bar // BLOCKS_PER_BAR,
+            stream_callback=self._audio_callback,
+            start=False
         )
         
         print("\n✅ Ready!")
@@ -597,30 +925,88 @@ class InfiniteGenerator:
         self.generation_thread.start()
         print("   🎵 Background audio generation started!")
         
+    def open_wav_file(self):
+        """Start a new timestamped WAV file that bars are streamed into"""
+        if self.wav_file:
+            self.wav_file.close()
+        timestamp = int(time.time())
+        self.current_file = f"sm_infinite_{timestamp}.wav"
+        self.wav_file = wave.open(self.current_file, 'wb')
+        self.wav_file.setnchannels(1)
+        self.wav_file.setsampwidth(2)
+        self.wav_file.setframerate(self.synth.sample_rate)
+        self.recorded_frames = 0
+    
     def start_recording(self):
         """Start recording to WAV file"""
         if not self.is_recording:
-            timestamp = int(time.time())
-            self.current_file = f"sm_infinite_{timestamp}.wav"
-            self.audio_buffer = AudioSegment.silent(duration=0)
+            self.open_wav_file()
             self.is_recording = True
             print(f"\n🔴 RECORDING: {self.current_file}")
         else:
             # Already recording, just create new file
-            timestamp = int(time.time())
-            self.current_file = f"sm_infinite_{timestamp}.wav"
-            self.audio_buffer = AudioSegment.silent(duration=0)
+            self.open_wav_file()
     
     def stop_recording(self):
         """Stop recording and save file"""
-        if self.is_recording and len(self.audio_buffer) > 0:
-            print(f"\n⏹️  Saving {self.current_file}...")
-            self.audio_buffer.export(self.current_file, format="wav")
-            duration = len(self.audio_buffer) / 1000
-            print(f"   ✅ Saved {duration:.1f} seconds")
+        if self.is_recording and self.wav_file:
+            # Bars were written as they played, so this just finalizes the header
+            self.wav_file.close()
+            self.wav_file = None
+            if self.recorded_frames > 0:
+                print(f"\n⏹️  Saving {self.current_file}...")
+                duration = self.recorded_frames / self.synth.sample_rate
+                print(f"   ✅ Saved {duration:.1f} seconds")
+            else:
+                os.remove(self.current_file)
             self.current_file = None
         self.is_recording = False
     
+    def _audio_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: serve the next frame_count frames from the queued bars"""
+        needed = frame_count * 2
+        chunks = []
+        
+        while needed > 0:
+            if self.playing_offset >= len(self.playing_data):
+                if not self.playback_bars:
+                    break
+                self.playing_data, self.now_playing = self.playback_bars.popleft()
+                self.playing_offset = 0
+            
+            # Slicing the memoryview is zero-copy
+            chunk = self.playing_data[self.playing_offset:self.playing_offset + needed]
+            self.playing_offset += len(chunk)
+            needed -= len(chunk)
+            chunks.append(chunk)
+        
+        # Underrun - pad with silence rather than stopping the stream
+        if needed > 0:
+            chunks.append(bytes(needed))
+        # PyAudio takes any bytes-like buffer, so a block inside one bar
+        # goes out as the view itself; only bar boundaries need a join
+        if len(chunks) == 1:
+            return chunks[0], self.pa_continue
+        return b''.join(chunks), self.pa_continue
+    
+    def queue_playback(self):
+        """Move finished bars from the generator to the audio callback, recording as they go"""
+        # Keep two bars ahead of the callback; the rest wait in audio_queue
+        while len(self.playback_bars) < 2:
+            try:
+                audio_data = self.audio_queue.get_nowait()
+            except queue.Empty:
+                return
+            
+            bar = audio_data['bar']
+            
+            # Stream to the recording file
+            if self.is_recording:
+                self.wav_file.writeframes(bar)
+                self.recorded_frames += len(bar) // 2
+            
+            self.playback_bars.append((memoryview(bar), audio_data))
+    
     def _generate_audio_loop(self):
         """Background thread that continuously generates audio bars"""
         bar_counter = 0
@@ -651,11 +1037,8 @@ class InfiniteGenerator:
                     # Just change bass without changing other patterns
                     self.mixer.randomize_patterns(change_bass=True)
                 
-                # Generate bar
-                bar = self.mixer.generate_bar(bar_counter)
-                
-                # Master the bar
-                bar = bar.normalize(headroom=1.5)
+                # Generate and master the bar
+                bar = self.mixer.generate_bar(bar_counter, headroom=1.5)
                 
                 # Calculate audio energy for visualization
                 is_chorus = self.mixer.current_section == 'chorus'
@@ -664,8 +1047,9 @@ class InfiniteGenerator:
                 mid = 0.8 if self.mixer.active_melody or self.mixer.active_lead else 0.4
                 high = 0.7 if self.mixer.active_arp else 0.3
                 
-                # Put in queue with metadata
-                self.audio_queue.put({
+                # Put in queue with metadata. Wait for space rather than dropping
+                # the finished bar and synthesizing another one
+                audio_data = {
                     'bar': bar,
                     'energy': energy,
                     'bass': bass,
@@ -673,28 +1057,31 @@ class InfiniteGenerator:
                     'high': high,
                     'bar_num': bar_counter,
                     'section': self.mixer.current_section
-                }, timeout=1.0)
+                }
+                while not self.stop_generation.is_set():
+                    try:
+                        self.audio_queue.put(audio_data, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
                 
                 bar_counter += 1
                 
-            except queue.Full:
-                # Queue is full, wait a bit
-                time.sleep(0.1)
             except Exception as e:
                 print(f"⚠️  Generation error: {e}")
                 time.sleep(0.1)
     
     def draw_ui(self):
-        """Draw UI elements"""
+        """Draw UI elements; returns the record button rect, or in minimal mode the text rects"""
         if self.minimal_mode:
             # Minimal mode - compact layout
-            font = pygame.font.Font(None, 20)
+            drawn = []
             
             # Status and bar on one line
             status = "🔴 REC" if self.is_recording else "⏹️  STOP"
             status_color = (255, 100, 100) if self.is_recording else (150, 150, 150)
-            status_text = font.render(f"{status} | Bar: {self.bar_counter}", True, status_color)
-            self.screen.blit(status_text, (10, 10))
+            status_text = self.render_text(20, f"{status} | Bar: {self.bar_counter}", status_color)
+            drawn.append(self.screen.blit(status_text, (10, 10)))
             
             # Section on second line
             section = getattr(self.mixer, 'current_section', 'playing').upper()
@@ -705,19 +1092,19 @@ class InfiniteGenerator:
                 'BREAKDOWN': (255, 150, 255)
             }
             section_color = section_colors.get(section, (200, 200, 200))
-            section_text = font.render(f"Section: {section}", True, section_color)
-            self.screen.blit(section_text, (10, 35))
+            section_text = self.render_text(20, f"Section: {section}", section_color)
+            drawn.append(self.screen.blit(section_text, (10, 35)))
             
             # File name on third line if recording
             if self.is_recording and self.current_file:
-                file_text = font.render(self.current_file[:40], True, (255, 255, 100))
-                self.screen.blit(file_text, (10, 60))
+                file_text = self.render_text(20, self.current_file[:40], (255, 255, 100))
+                drawn.append(self.screen.blit(file_text, (10, 60)))
             
             # Help text
-            help_text = font.render("V=Full | SPACE=Rec | ESC=Quit", True, (100, 100, 100))
-            self.screen.blit(help_text, (10, 90))
+            help_text = self.render_text(20, "V=Full | SPACE=Rec | ESC=Quit", (100, 100, 100))
+            drawn.append(self.screen.blit(help_text, (10, 90)))
             
-            return (0, 0, 0, 0)  # No button in minimal mode
+            return drawn  # No button in minimal mode
         
         else:
             # Full mode - regular layout
@@ -741,14 +1128,13 @@ class InfiniteGenerator:
                            (button_x, button_y, button_size, button_size), 3)
             
             # Status text
-            font = pygame.font.Font(None, 24)
             status = "REC" if self.is_recording else "STOP"
             status_color = (255, 100, 100) if self.is_recording else (150, 150, 150)
-            text = font.render(status, True, status_color)
+            text = self.render_text(24, status, status_color)
             self.screen.blit(text, (button_x - 45, button_y + 10))
             
             # Bar counter and section
-            bar_text = font.render(f"Bar: {self.bar_counter}", True, (200, 200, 200))
+            bar_text = self.render_text(24, f"Bar: {self.bar_counter}", (200, 200, 200))
             self.screen.blit(bar_text, (10, 10))
             
             # Current section (big and prominent!)
@@ -760,17 +1146,28 @@ class InfiniteGenerator:
                 'BREAKDOWN': (255, 150, 255)
             }
             section_color = section_colors.get(section, (200, 200, 200))
-            big_font = pygame.font.Font(None, 32)
-            section_text = big_font.render(section, True, section_color)
+            section_text = self.render_text(32, section, section_color)
             self.screen.blit(section_text, (10, 40))
             
             # File name if recording
             if self.is_recording and self.current_file:
-                file_text = font.render(self.current_file, True, (255, 255, 100))
+                file_text = self.render_text(24, self.current_file, (255, 255, 100))
                 self.screen.blit(file_text, (10, self.height - 30))
             
             return (button_x, button_y, button_size, button_size)
     
+    def render_text(self, size, text, color):
+        """Render antialiased UI text, reusing the surface while the text stays the same"""
+        key = (size, text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            # Bar numbers and file names keep changing, so don't grow forever
+            if len(self.text_cache) >= 64:
+                self.text_cache.clear()
+            surface = self.fonts[size].render(text, True, color)
+            self.text_cache[key] = surface
+        return surface
+    
     def check_button_click(self, pos, button_rect):
         """Check if record button was clicked"""
         bx, by, bw, bh = button_rect
@@ -794,6 +1191,9 @@ class InfiniteGenerator:
             self.width = self.mini_width
             self.height = self.mini_height
             self.screen = pygame.display.set_mode((self.width, self.height))
+            # Fresh window: clear and push all of it on the first frame
+            self.minimal_ui_state = None
+            self.minimal_dirty = [self.screen.get_rect()]
             print("\n📉 Minimal mode (low CPU)")
         else:
             # Switch to full mode
@@ -819,94 +1219,76 @@ class InfiniteGenerator:
                     running = False
         
         print("🎵 Playing!")
+        self.queue_playback()
+        self.audio_stream.start_stream()
+        shown_bar = None
         
         while running:
-            try:
-                # Get next bar from queue (with timeout to check events)
-                audio_data = self.audio_queue.get(timeout=0.5)
-                bar = audio_data['bar']
-                
-                # Update bar counter
+            self.queue_playback()
+            
+            # Follow the bar the callback is actually playing
+            audio_data = self.now_playing
+            if audio_data is not None and audio_data is not shown_bar:
+                shown_bar = audio_data
                 self.bar_counter = audio_data['bar_num']
-                
-                # Add to recording buffer
-                if self.is_recording:
-                    self.audio_buffer += bar
-                
-                # Update visualization parameters
                 self.visualizer.update_audio_data(
                     audio_data['energy'],
                     audio_data['bass'],
                     audio_data['mid'],
                     audio_data['high']
                 )
-                
-                # Play audio (this will block for ~bar duration)
-                # We'll update visualization in a non-blocking way
-                raw_data = bar.raw_data
-                chunk_size = 2048  # Small chunks for responsiveness
-                
-                for i in range(0, len(raw_data), chunk_size):
-                    # Check for quit events while playing
-                    for event in pygame.event.get():
-                        if event.type == pygame.QUIT:
-                            running = False
-                            break
-                        elif event.type == pygame.KEYDOWN:
-                            if event.key == pygame.K_ESCAPE:
-                                running = False
-                                break
-                            elif event.key == pygame.K_SPACE:
-                                if not space_was_pressed:
-                                    self.toggle_recording()
-                                    space_was_pressed = True
-                            elif event.key == pygame.K_v:
-                                self.toggle_visualization()
-                        elif event.type == pygame.KEYUP:
-                            if event.key == pygame.K_SPACE:
-                                space_was_pressed = False
-                        elif event.type == pygame.MOUSEBUTTONDOWN:
-                            if event.button == 1:
-                                button_rect = (self.width - 50, 10, 40, 40)
-                                if self.check_button_click(event.pos, button_rect):
-                                    self.toggle_recording()
-                    
-                    if not running:
-                        break
-                    
-                    # Play chunk
-                    chunk = raw_data[i:i+chunk_size]
-                    self.audio_stream.write(chunk)
-                    
-                    # Update and draw visualization
-                    if self.minimal_mode:
-                        # Minimal mode - just black screen with text
-                        self.screen.fill((0, 0, 0))
-                        self.draw_ui()
-                    else:
-                        # Full visualization mode
-                        self.visualizer.update()
-                        self.visualizer.draw(self.screen)
-                        self.draw_ui()
-                    
-                    pygame.display.flip()
-                    
-            except queue.Empty:
-                # No audio ready, just update visualization
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
+            
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                    break
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
                         running = False
-                
-                if self.minimal_mode:
-                    self.screen.fill((0, 0, 0))
-                    self.draw_ui()
-                else:
-                    self.visualizer.update()
-                    self.visualizer.draw(self.screen)
-                    self.draw_ui()
-                
+                        break
+                    elif event.key == pygame.K_SPACE:
+                        if not space_was_pressed:
+                            self.toggle_recording()
+                            space_was_pressed = True
+                    elif event.key == pygame.K_v:
+                        self.toggle_visualization()
+                elif event.type == pygame.KEYUP:
+                    if event.key == pygame.K_SPACE:
+                        space_was_pressed = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 1:
+                        button_rect = (self.width - 50, 10, 40, 40)
+                        if self.check_button_click(event.pos, button_rect):
+                            self.toggle_recording()
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    # Window was uncovered or restored: repaint all of it next frame
+                    self.minimal_ui_state = None
+                    self.minimal_dirty = [self.screen.get_rect()]
+            
+            if not running:
+                break
+            
+            # Update and draw visualization
+            if self.minimal_mode:
+                # Minimal mode - just black screen with text. The text only
+                # changes with the recording state, bar or section, so redraw
+                # then and push just the old and new text rects to the display
+                ui_state = (self.is_recording, self.bar_counter, self.current_file,
+                            getattr(self.mixer, 'current_section', None))
+                if ui_state != self.minimal_ui_state:
+                    self.minimal_ui_state = ui_state
+                    for rect in self.minimal_dirty:
+                        self.screen.fill((0, 0, 0), rect)
+                    drawn = self.draw_ui()
+                    pygame.display.update(self.minimal_dirty + drawn)
+                    self.minimal_dirty = drawn
+            else:
+                # Full visualization mode
+                self.visualizer.update()
+                self.visualizer.draw(self.screen)
+                self.draw_ui()
                 pygame.display.flip()
-                self.clock.tick(60)
+            self.clock.tick(MINIMAL_FPS if self.minimal_mode else FULL_FPS)
         
         # Clean up
         print("\n🛑 Stopping...")
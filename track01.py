@@ -1,8 +1,11 @@
 from pydub.generators import Sine, Square, Sawtooth, WhiteNoise
-from pydub import AudioSegment
 import mido
 import math
+import os
 import random
+import wave
+import itertools
+from functools import lru_cache
 import numpy as np
 
 # Synthesizer classes
@@ -11,32 +14,41 @@ class Synthesizer:
         self.sample_rate = sample_rate
         
     def generate_waveform(self, frequency, duration_ms, waveform='sine', phase=0):
-        """Generate a waveform with given frequency and duration"""
+        """Generate a float32 waveform in [-1, 1] with given frequency and duration"""
         num_samples = int(self.sample_rate * duration_ms / 1000)
-        t = np.arange(num_samples) / self.sample_rate
         
-        if waveform == 'sine':
-            samples = np.sin(2 * np.pi * frequency * t + phase)
-        elif waveform == 'square':
-            samples = np.sign(np.sin(2 * np.pi * frequency * t + phase))
-        elif waveform == 'sawtooth':
-            samples = 2 * (frequency * t % 1) - 1
-        elif waveform == 'triangle':
-            samples = 2 * np.abs(2 * (frequency * t % 1) - 1) - 1
+        # Every step works in place on one buffer: the time base becomes the
+        # phase, then the waveform, with few temporaries
+        samples = np.arange(num_samples, dtype=np.float64)
+        samples /= self.sample_rate
+        
+        # Wrap the phase to one cycle in float64, then shape the wave in
+        # float32: half the bandwidth for the saw/square stacks, NumPy's
+        # float32 sin is SIMD-vectorized (float64 isn't), and a wrapped
+        # phase keeps float32 accurate to ~0.02 LSB
+        samples *= frequency
+        if phase and waveform not in ('sawtooth', 'triangle'):
+            samples += phase / (2 * np.pi)  # Only the sine-based waves take a phase
+        samples -= np.floor(samples)
+        samples = samples.astype(np.float32)
+        
+        if waveform in ('sawtooth', 'triangle'):
+            samples *= 2
+            samples -= 1
+            if waveform == 'triangle':
+                np.abs(samples, out=samples)
+                samples *= 2
+                samples -= 1
         else:
-            samples = np.sin(2 * np.pi * frequency * t + phase)
-        
-        # Convert to 16-bit PCM
-        samples = (samples * 32767).astype(np.int16)
-        audio_data = samples.tobytes()
-        
-        return AudioSegment(
-            data=audio_data,
-            sample_width=2,
-            frame_rate=self.sample_rate,
-            channels=1
-        )
+            samples *= 2 * np.pi
+            np.sin(samples, out=samples)
+            if waveform == 'square':
+                np.sign(samples, out=samples)
+        
+        # Stay in float32 full-scale units; the mix is quantized once at export
+        return samples
     
+    @lru_cache(maxsize=512)
     def bass_synth(self, frequency, duration_ms, cutoff_mod=1.0):
         """Create a fat bass sound with multiple oscillators"""
         # Main oscillator - square wave
@@ -47,13 +59,14 @@ class Synthesizer:
         bass3 = self.generate_waveform(frequency * 1.01, duration_ms, 'sawtooth')
         
         # Mix oscillators
-        bass = bass1.overlay(bass2 - 3).overlay(bass3 - 6)
+        bass = overlay(overlay(bass1, bass2, -3), bass3, -6)
         
         # Apply envelope (ADSR-like)
         bass = self.apply_envelope(bass, attack=5, decay=50, sustain=0.7, release=100)
         
         return bass
     
+    @lru_cache(maxsize=512)
     def lead_synth(self, frequency, duration_ms, cutoff=1.0):
         """Create an aggressive lead sound"""
         # Detuned sawtooth oscillators
@@ -62,30 +75,32 @@ class Synthesizer:
         lead3 = self.generate_waveform(frequency * 0.995, duration_ms, 'square')
         
         # Mix and apply envelope
-        lead = lead1.overlay(lead2 - 2).overlay(lead3 - 4)
+        lead = overlay(overlay(lead1, lead2, -2), lead3, -4)
         lead = self.apply_envelope(lead, attack=10, decay=100, sustain=0.6, release=150)
         
         return lead
     
+    @lru_cache(maxsize=512)
     def acid_bass(self, frequency, duration_ms, resonance=0.8):
         """Create a 303-style acid bass"""
         # Sawtooth base
         acid = self.generate_waveform(frequency, duration_ms, 'sawtooth')
         # Add some square for bite
-        acid = acid.overlay(self.generate_waveform(frequency, duration_ms, 'square') - 6)
+        acid = overlay(acid, self.generate_waveform(frequency, duration_ms, 'square'), -6)
         
         # Aggressive envelope
         acid = self.apply_envelope(acid, attack=1, decay=80, sustain=0.3, release=50)
         
         return acid
     
+    @lru_cache(maxsize=512)
     def pad_synth(self, frequency, duration_ms):
         """Create a lush pad sound"""
         # Multiple detuned sines
         pad = self.generate_waveform(frequency, duration_ms, 'sine')
-        pad = pad.overlay(self.generate_waveform(frequency * 1.01, duration_ms, 'sine') - 3)
-        pad = pad.overlay(self.generate_waveform(frequency * 0.99, duration_ms, 'sine') - 3)
-        pad = pad.overlay(self.generate_waveform(frequency * 2, duration_ms, 'sine') - 8)
+        pad = overlay(pad, self.generate_waveform(frequency * 1.01, duration_ms, 'sine'), -3)
+        pad = overlay(pad, self.generate_waveform(frequency * 0.99, duration_ms, 'sine'), -3)
+        pad = overlay(pad, self.generate_waveform(frequency * 2, duration_ms, 'sine'), -8)
         
         # Slow attack, long release
         pad = self.apply_envelope(pad, attack=200, decay=300, sustain=0.8, release=400)
@@ -93,22 +108,43 @@ class Synthesizer:
         return pad
     
     def apply_envelope(self, audio, attack=10, decay=100, sustain=0.7, release=100):
-        """Apply ADSR envelope to audio"""
-        total_ms = len(audio)
-        
-        # Create fade in (attack)
-        if attack > 0:
-            audio = audio.fade_in(min(attack, total_ms // 2))
+        """Apply ADSR envelope to audio in place; the result is read-only since voices are cached"""
+        total_ms = len(audio) * 1000 // self.sample_rate
         
-        # Create fade out (release)
-        if release > 0:
-            audio = audio.fade_out(min(release, total_ms // 2))
+        # Fade in (attack) and fade out (release), each at most half the sound
+        attack_n = int(min(attack, total_ms // 2) * self.sample_rate / 1000)
+        release_n = int(min(release, total_ms // 2) * self.sample_rate / 1000)
+        audio *= _env(len(audio), attack_n, release_n)
         
+        audio.setflags(write=False)
         return audio
 
+@lru_cache(maxsize=128)
+def _env(n, attack_n, release_n):
+    """Read-only float32 envelope: linear 0->1 over attack_n, 1.0, then 1->0 over release_n"""
+    env = np.ones(n, dtype=np.float32)
+    env[:attack_n] = np.linspace(0, 1, attack_n, endpoint=False)
+    env[n - release_n:] *= np.linspace(1, 0, release_n, endpoint=False)
+    env.setflags(write=False)
+    return env
+
+def db_to_gain(db):
+    """Linear amplitude factor for a gain in dB"""
+    return 10 ** (db / 20)
+
+def overlay(base, layer, gain_db=0):
+    """Add layer into base in place at gain_db, saturating at full scale like AudioSegment.overlay"""
+    layer = layer * db_to_gain(gain_db)
+    base += layer
+    return np.clip(base, -1, 1, out=base)
+
+# Summed gain of the clap's three attacks (0, 10 and 20 ms, at 1, 0.8 and 0.6)
+CLAP_ATTACKS = 1 + 0.8 * math.exp(0.01 * 30) + 0.6 * math.exp(0.02 * 30)
+
 class DrumMachine:
-    def __init__(self, sample_rate=44100):
+    def __init__(self, sample_rate=44100, seed=None):
         self.sample_rate = sample_rate
+        self.rng = np.random.default_rng(seed)  # Noise source for snares, hats and claps
         
     def kick(self, duration_ms=300):
         """Generate a punchy techno kick"""
@@ -116,33 +152,34 @@ class DrumMachine:
         num_samples = int(self.sample_rate * duration_ms / 1000)
         t = np.arange(num_samples) / self.sample_rate
         
-        # Frequency sweep from 150Hz to 40Hz
-        freq = 150 * np.exp(-t * 10)
-        phase = np.cumsum(2 * np.pi * freq / self.sample_rate)
+        # Everything below works in place on kick plus one scratch buffer
+        kick = np.empty(num_samples)
+        scratch = np.empty(num_samples)
+        
+        # Frequency sweep from 150Hz to 40Hz, accumulated into phase
+        np.multiply(t, -10, out=kick)
+        np.exp(kick, out=kick)
+        kick *= 2 * np.pi * 150 / self.sample_rate
+        np.cumsum(kick, out=kick)
         
         # Generate sine wave
-        kick = np.sin(phase)
+        np.sin(kick, out=kick)
         
         # Apply exponential decay envelope
-        envelope = np.exp(-t * 12)
-        kick = kick * envelope
+        np.multiply(t, -12, out=scratch)
+        kick *= np.exp(scratch, out=scratch)
         
         # Add click for punch
-        click = np.exp(-t * 50)
-        kick = kick + click * 0.3
-        
-        # Clip and convert
-        kick = np.clip(kick, -1, 1)
-        kick = (kick * 32767).astype(np.int16)
-        
-        audio = AudioSegment(
-            data=kick.tobytes(),
-            sample_width=2,
-            frame_rate=self.sample_rate,
-            channels=1
-        )
-        
-        return audio + 3  # Boost kick
+        np.multiply(t, -50, out=scratch)
+        np.exp(scratch, out=scratch)
+        scratch *= 0.3
+        kick += scratch
+        
+        # Clip, then boost kick, clipping again at full scale
+        np.clip(kick, -1, 1, out=kick)
+        kick *= db_to_gain(3)
+        np.clip(kick, -1, 1, out=kick)
+        return kick.astype(np.float32)
     
     def snare(self, duration_ms=200):
         """Generate a snare"""
@@ -150,27 +187,24 @@ class DrumMachine:
         t = np.arange(num_samples) / self.sample_rate
         
         # Tone component (200Hz)
-        tone = np.sin(2 * np.pi * 200 * t)
+        tone = np.multiply(t, 2 * np.pi * 200)
+        np.sin(tone, out=tone)
         
         # Noise component
-        noise = np.random.randn(num_samples)
+        snare = self.rng.standard_normal(num_samples, dtype=np.float32)
         
-        # Mix tone and noise
-        snare = tone * 0.3 + noise * 0.7
+        # Mix tone and noise in place
+        snare *= 0.7
+        tone *= 0.3
+        snare += tone
         
-        # Apply envelope
-        envelope = np.exp(-t * 20)
-        snare = snare * envelope
+        # Apply envelope, reusing the tone buffer
+        np.multiply(t, -20, out=tone)
+        snare *= np.exp(tone, out=tone)
         
-        snare = np.clip(snare, -1, 1)
-        snare = (snare * 32767 * 0.6).astype(np.int16)
-        
-        return AudioSegment(
-            data=snare.tobytes(),
-            sample_width=2,
-            frame_rate=self.sample_rate,
-            channels=1
-        )
+        np.clip(snare, -1, 1, out=snare)
+        snare *= 0.6
+        return snare
     
     def hihat(self, duration_ms=50, closed=True):
         """Generate hi-hat"""
@@ -178,27 +212,24 @@ class DrumMachine:
         t = np.arange(num_samples) / self.sample_rate
         
         # High-frequency noise
-        hihat = np.random.randn(num_samples)
+        hihat = self.rng.standard_normal(num_samples, dtype=np.float32)
+        scratch = np.empty(num_samples)
         
         # High-pass character using multiple sines
         for freq in [8000, 10000, 12000]:
-            hihat += np.sin(2 * np.pi * freq * t) * 0.1
+            np.multiply(t, 2 * np.pi * freq, out=scratch)
+            np.sin(scratch, out=scratch)
+            scratch *= 0.1
+            hihat += scratch
         
         # Envelope
         decay = 40 if closed else 15
-        envelope = np.exp(-t * decay)
-        hihat = hihat * envelope
-        
-        hihat = np.clip(hihat, -1, 1)
-        gain = 0.3 if closed else 0.4
-        hihat = (hihat * 32767 * gain).astype(np.int16)
-        
-        return AudioSegment(
-            data=hihat.tobytes(),
-            sample_width=2,
-            frame_rate=self.sample_rate,
-            channels=1
-        )
+        np.multiply(t, -decay, out=scratch)
+        hihat *= np.exp(scratch, out=scratch)
+        
+        np.clip(hihat, -1, 1, out=hihat)
+        hihat *= 0.3 if closed else 0.4
+        return hihat
     
     def clap(self, duration_ms=150):
         """Generate a clap"""
@@ -206,47 +237,61 @@ class DrumMachine:
         t = np.arange(num_samples) / self.sample_rate
         
         # Noise burst
-        clap = np.random.randn(num_samples)
-        
-        # Multiple attacks for realistic clap
-        envelope = (np.exp(-t * 30) + 
-                   np.exp(-(t - 0.01) * 30) * 0.8 +
-                   np.exp(-(t - 0.02) * 30) * 0.6)
-        envelope = np.maximum(envelope, 0)
-        
-        clap = clap * envelope
-        clap = np.clip(clap, -1, 1)
-        clap = (clap * 32767 * 0.5).astype(np.int16)
-        
-        return AudioSegment(
-            data=clap.tobytes(),
-            sample_width=2,
-            frame_rate=self.sample_rate,
-            channels=1
-        )
+        clap = self.rng.standard_normal(num_samples, dtype=np.float32)
+        
+        # Multiple attacks for realistic clap. Each later attack is the same
+        # decay scaled by exp(30 * offset), so the sum is one exp times CLAP_ATTACKS
+        envelope = np.multiply(t, -30)
+        np.exp(envelope, out=envelope)
+        envelope *= CLAP_ATTACKS
+        
+        clap *= envelope
+        np.clip(clap, -1, 1, out=clap)
+        clap *= 0.5
+        return clap
 
 def midi_to_freq(midi_note):
     """Convert MIDI note number to frequency"""
     return 440.0 * (2.0 ** ((midi_note - 69) / 12.0))
 
-def parse_midi_file(filepath):
-    """Extract note patterns from MIDI file"""
+# Hz for notes 0-127, looked up when the bass and lead lines are laid out
+MIDI_FREQ = [midi_to_freq(note) for note in range(128)]
+
+def mix_at(mix, sound, position_ms, gain_db=0, sample_rate=44100):
+    """Add a float32 sound into the mix buffer at position_ms, gain_db louder"""
+    start = int(position_ms * sample_rate / 1000)
+    samples = sound[:max(len(mix) - start, 0)]
+    # Plain additive sum; clipping and rounding happen once, at mastering
+    mix[start:start + len(samples)] += samples * db_to_gain(gain_db)
+
+def normalize_gain(peak, headroom=0.1):
+    """Linear gain that brings a full-scale peak to headroom dB below 1, like AudioSegment.normalize"""
+    return db_to_gain(-headroom) / peak if peak else 1.0
+
+# One packed record per note instead of a dict per note
+NOTE_DTYPE = np.dtype([('note', np.uint8), ('velocity', np.uint8), ('time', np.int64)])
+
+@lru_cache(maxsize=32)
+def _parse_midi_file(filepath, mtime, size):
+    """Parse a MIDI file; mtime and size make edited files miss the cache"""
     mid = mido.MidiFile(filepath)
-    notes = []
     
-    for track in mid.tracks:
+    def note_ons(track):
         time = 0
         for msg in track:
             time += msg.time
             if msg.type == 'note_on' and msg.velocity > 0:
-                notes.append({
-                    'note': msg.note,
-                    'velocity': msg.velocity,
-                    'time': time
-                })
+                yield msg.note, msg.velocity, time
     
+    notes = np.array([note for track in mid.tracks for note in note_ons(track)], dtype=NOTE_DTYPE)
+    notes.setflags(write=False)  # Shared by every caller of the cache
     return notes
 
+def parse_midi_file(filepath):
+    """Extract note patterns from MIDI file, reusing the previous parse if the file is unchanged"""
+    stat = os.stat(filepath)
+    return _parse_midi_file(filepath, stat.st_mtime, stat.st_size)
+
 def generate_epic_techno_track():
     """Generate an EPIC techno track with MIDI inspiration"""
     print("🎵 Initializing epic techno generation...")
@@ -265,15 +310,15 @@ def generate_epic_techno_track():
     try:
         midi_notes_1 = parse_midi_file('reference/Lower Norfair 2 MIDI.mid')
         midi_notes_2 = parse_midi_file('reference/lower-norfair-2-.mid')
-        all_midi_notes = midi_notes_1 + midi_notes_2
+        all_midi_notes = np.concatenate([midi_notes_1, midi_notes_2])
         print(f"   Found {len(all_midi_notes)} notes to inspire our track!")
     except:
         print("   Using generated patterns instead")
-        all_midi_notes = []
+        all_midi_notes = np.empty(0, dtype=NOTE_DTYPE)
     
     # Extract unique notes for our sequences
-    if all_midi_notes:
-        unique_notes = list(set([n['note'] for n in all_midi_notes[:32]]))
+    if len(all_midi_notes):
+        unique_notes = list(set(all_midi_notes['note'][:32].tolist()))
         bass_notes = [n for n in unique_notes if n < 60][:8]
         lead_notes = [n for n in unique_notes if n >= 60][:8]
     else:
@@ -290,69 +335,83 @@ def generate_epic_techno_track():
     
     print(f"🎛️  Generating {num_bars} bars of pure techno energy...")
     
-    # Initialize empty track
-    track = AudioSegment.silent(duration=int(track_duration))
+    # Render each drum once up front. The kick is deterministic; the noise
+    # drums cycle through a few takes so repeated hits don't sound identical
+    kick = drums.kick()
+    snares = itertools.cycle([drums.snare() for _ in range(8)])
+    claps = itertools.cycle([drums.clap() for _ in range(8)])
+    hihats = {closed: itertools.cycle([drums.hihat(closed=closed) for _ in range(8)])
+              for closed in (True, False)}
+    
+    # Hit offsets within a bar and note frequencies, computed once for all bars
+    bar_starts = [int(bar * bar_duration) for bar in range(num_bars)]
+    beats = [int(beat * beat_duration) for beat in range(4)]
+    eighths = [int(eighth * beat_duration / 2) for eighth in range(8)]
+    sixteenths = [int(sixteenth * beat_duration / 4) for sixteenth in range(16)]
+    bass_freqs = [MIDI_FREQ[note] for note in bass_notes]
+    lead_freqs = [MIDI_FREQ[note] for note in lead_notes]
+    
+    # Initialize empty track: one float32 buffer that every sound is summed into
+    mix = np.zeros(int(track_duration * synth.sample_rate / 1000), dtype=np.float32)
     
     # SECTION 1: Build-up (Bars 0-8)
     print("   [Section 1] Building tension...")
     for bar in range(8):
-        bar_start = int(bar * bar_duration)
+        bar_start = bar_starts[bar]
         
         # Kick drum (every beat from bar 4)
         if bar >= 4:
             for beat in range(4):
-                kick_pos = bar_start + int(beat * beat_duration)
-                track = track.overlay(drums.kick(), position=kick_pos)
+                kick_pos = bar_start + beats[beat]
+                mix_at(mix, kick, kick_pos)
         
         # Hi-hats (16th notes from bar 2)
         if bar >= 2:
             for sixteenth in range(16):
-                hihat_pos = bar_start + int(sixteenth * beat_duration / 4)
-                track = track.overlay(drums.hihat(closed=True), position=hihat_pos)
+                hihat_pos = bar_start + sixteenths[sixteenth]
+                mix_at(mix, next(hihats[True]), hihat_pos)
         
         # Bass (enters bar 6)
         if bar >= 6:
             for beat in range(4):
                 note_idx = (bar * 4 + beat) % len(bass_notes)
-                bass_note = bass_notes[note_idx]
-                bass_freq = midi_to_freq(bass_note)
-                bass_pos = bar_start + int(beat * beat_duration)
+                bass_freq = bass_freqs[note_idx]
+                bass_pos = bar_start + beats[beat]
                 bass_sound = synth.bass_synth(bass_freq, beat_duration * 0.9)
-                track = track.overlay(bass_sound - 6, position=bass_pos)
+                mix_at(mix, bass_sound, bass_pos, -6)
     
     # SECTION 2: Main drop (Bars 8-24)
     print("   [Section 2] DROPPING THE BASS 💥")
     for bar in range(8, 24):
-        bar_start = int(bar * bar_duration)
+        bar_start = bar_starts[bar]
         
         # Four-to-the-floor kick
         for beat in range(4):
-            kick_pos = bar_start + int(beat * beat_duration)
-            track = track.overlay(drums.kick(), position=kick_pos)
+            kick_pos = bar_start + beats[beat]
+            mix_at(mix, kick, kick_pos)
         
         # Snare on 2 and 4
         for snare_beat in [1, 3]:
-            snare_pos = bar_start + int(snare_beat * beat_duration)
-            track = track.overlay(drums.snare(), position=snare_pos)
+            snare_pos = bar_start + beats[snare_beat]
+            mix_at(mix, next(snares), snare_pos)
         
         # 16th note hi-hats
         for sixteenth in range(16):
-            hihat_pos = bar_start + int(sixteenth * beat_duration / 4)
+            hihat_pos = bar_start + sixteenths[sixteenth]
             closed = sixteenth % 4 != 3
-            track = track.overlay(drums.hihat(closed=closed), position=hihat_pos)
+            mix_at(mix, next(hihats[closed]), hihat_pos)
         
         # Clap layers
         if bar % 2 == 1:
             for clap_beat in [1, 3]:
-                clap_pos = bar_start + int(clap_beat * beat_duration + beat_duration/2)
-                track = track.overlay(drums.clap() - 3, position=clap_pos)
+                clap_pos = bar_start + eighths[2 * clap_beat + 1]
+                mix_at(mix, next(claps), clap_pos, -3)
         
         # Aggressive acid bass line
         for beat in range(4):
             note_idx = (bar * 4 + beat) % len(bass_notes)
-            bass_note = bass_notes[note_idx]
-            bass_freq = midi_to_freq(bass_note)
-            bass_pos = bar_start + int(beat * beat_duration)
+            bass_freq = bass_freqs[note_idx]
+            bass_pos = bar_start + beats[beat]
             
             # Alternate between bass types
             if bar % 4 < 2:
@@ -360,7 +419,7 @@ def generate_epic_techno_track():
             else:
                 bass_sound = synth.bass_synth(bass_freq, beat_duration * 0.9)
             
-            track = track.overlay(bass_sound - 5, position=bass_pos)
+            mix_at(mix, bass_sound, bass_pos, -5)
         
         # Lead synth (enters bar 12)
         if bar >= 12:
@@ -368,91 +427,86 @@ def generate_epic_techno_track():
             for lead_step in range(8):
                 if random.random() > 0.3:  # Add some variation
                     note_idx = (bar * 8 + lead_step) % len(lead_notes)
-                    lead_note = lead_notes[note_idx]
-                    lead_freq = midi_to_freq(lead_note)
-                    lead_pos = bar_start + int(lead_step * beat_duration / 2)
+                    lead_freq = lead_freqs[note_idx]
+                    lead_pos = bar_start + eighths[lead_step]
                     lead_sound = synth.lead_synth(lead_freq, beat_duration * 0.4)
-                    track = track.overlay(lead_sound - 10, position=lead_pos)
+                    mix_at(mix, lead_sound, lead_pos, -10)
         
         # Add pads for atmosphere (from bar 16)
         if bar >= 16 and bar % 4 == 0:
-            pad_note = lead_notes[bar % len(lead_notes)]
-            pad_freq = midi_to_freq(pad_note)
+            pad_freq = lead_freqs[bar % len(lead_notes)]
             pad_sound = synth.pad_synth(pad_freq, bar_duration * 4)
-            track = track.overlay(pad_sound - 18, position=bar_start)
+            mix_at(mix, pad_sound, bar_start, -18)
     
     # SECTION 3: Breakdown (Bars 24-32)
     print("   [Section 3] Breaking it down...")
     for bar in range(24, 32):
-        bar_start = int(bar * bar_duration)
+        bar_start = bar_starts[bar]
         
         # Kick drops out progressively
         if bar < 28:
             for beat in range(4):
                 if not (bar >= 26 and beat % 2 == 1):  # Remove some kicks
-                    kick_pos = bar_start + int(beat * beat_duration)
-                    track = track.overlay(drums.kick(), position=kick_pos)
+                    kick_pos = bar_start + beats[beat]
+                    mix_at(mix, kick, kick_pos)
         
         # Sparse hi-hats
         for eighth in range(8):
             if random.random() > 0.5:
-                hihat_pos = bar_start + int(eighth * beat_duration / 2)
-                track = track.overlay(drums.hihat(closed=False) - 3, position=hihat_pos)
+                hihat_pos = bar_start + eighths[eighth]
+                mix_at(mix, next(hihats[False]), hihat_pos, -3)
         
         # Atmospheric pads
         if bar % 2 == 0:
-            pad_note = lead_notes[(bar // 2) % len(lead_notes)]
-            pad_freq = midi_to_freq(pad_note)
+            pad_freq = lead_freqs[(bar // 2) % len(lead_notes)]
             pad_sound = synth.pad_synth(pad_freq, bar_duration * 2)
-            track = track.overlay(pad_sound - 16, position=bar_start)
+            mix_at(mix, pad_sound, bar_start, -16)
         
         # Melodic lead
         for beat in range(4):
             note_idx = (bar * 4 + beat) % len(lead_notes)
-            lead_note = lead_notes[note_idx]
-            lead_freq = midi_to_freq(lead_note)
-            lead_pos = bar_start + int(beat * beat_duration)
+            lead_freq = lead_freqs[note_idx]
+            lead_pos = bar_start + beats[beat]
             lead_sound = synth.lead_synth(lead_freq, beat_duration * 1.5)
-            track = track.overlay(lead_sound - 12, position=lead_pos)
+            mix_at(mix, lead_sound, lead_pos, -12)
     
     # SECTION 4: Final drop (Bars 32-48)
     print("   [Section 4] FINAL DROP - Going HARD 🔥")
     for bar in range(32, 48):
-        bar_start = int(bar * bar_duration)
+        bar_start = bar_starts[bar]
         
         # Heavy kick
         for beat in range(4):
-            kick_pos = bar_start + int(beat * beat_duration)
-            track = track.overlay(drums.kick() + 2, position=kick_pos)
+            kick_pos = bar_start + beats[beat]
+            mix_at(mix, kick, kick_pos, 2)
         
         # Layered snares and claps
         for snare_beat in [1, 3]:
-            hit_pos = bar_start + int(snare_beat * beat_duration)
-            track = track.overlay(drums.snare(), position=hit_pos)
-            track = track.overlay(drums.clap() - 2, position=hit_pos + 10)
+            hit_pos = bar_start + beats[snare_beat]
+            mix_at(mix, next(snares), hit_pos)
+            mix_at(mix, next(claps), hit_pos + 10, -2)
         
         # Complex hi-hat pattern
         for sixteenth in range(16):
-            hihat_pos = bar_start + int(sixteenth * beat_duration / 4)
+            hihat_pos = bar_start + sixteenths[sixteenth]
             closed = not (sixteenth % 4 == 3 or sixteenth % 4 == 1)
             gain_adj = -2 if sixteenth % 4 == 0 else -4
-            track = track.overlay(drums.hihat(closed=closed) + gain_adj, position=hihat_pos)
+            mix_at(mix, next(hihats[closed]), hihat_pos, gain_adj)
         
         # Two bass layers for maximum impact
         for beat in range(4):
             note_idx = (bar * 4 + beat) % len(bass_notes)
-            bass_note = bass_notes[note_idx]
-            bass_freq = midi_to_freq(bass_note)
-            bass_pos = bar_start + int(beat * beat_duration)
+            bass_freq = bass_freqs[note_idx]
+            bass_pos = bar_start + beats[beat]
             
             # Layer 1: Deep sub
             bass1 = synth.bass_synth(bass_freq, beat_duration * 0.9)
-            track = track.overlay(bass1 - 4, position=bass_pos)
+            mix_at(mix, bass1, bass_pos, -4)
             
             # Layer 2: Acid line
             if beat % 2 == 0:
                 bass2 = synth.acid_bass(bass_freq * 2, beat_duration * 0.6)
-                track = track.overlay(bass2 - 8, position=bass_pos)
+                mix_at(mix, bass2, bass_pos, -8)
         
         # Aggressive lead stabs
         if bar % 2 == 0:
@@ -460,34 +514,45 @@ def generate_epic_techno_track():
                 if random.random() > 0.2:
                     note_idx = (bar * 4 + stab) % len(lead_notes)
                     lead_note = lead_notes[note_idx] + (12 if stab % 2 else 0)
-                    lead_freq = midi_to_freq(lead_note)
-                    stab_pos = bar_start + int(stab * beat_duration)
+                    lead_freq = MIDI_FREQ[lead_note]
+                    stab_pos = bar_start + beats[stab]
                     lead_sound = synth.lead_synth(lead_freq, beat_duration * 0.3)
-                    track = track.overlay(lead_sound - 8, position=stab_pos)
+                    mix_at(mix, lead_sound, stab_pos, -8)
         
         # Pad layers for depth
         if bar % 4 == 0:
-            pad_note = lead_notes[0]  # Root note
-            pad_freq = midi_to_freq(pad_note)
+            pad_freq = lead_freqs[0]  # Root note
             pad_sound = synth.pad_synth(pad_freq, bar_duration * 4)
-            track = track.overlay(pad_sound - 20, position=bar_start)
+            mix_at(mix, pad_sound, bar_start, -20)
     
     # Apply mastering effects
     print("🎚️  Applying mastering effects...")
     
-    # Subtle compression (normalize, then reduce peaks)
-    track = track.normalize()
+    # The summed mix drives past full scale in the drops; clip it there
+    np.clip(mix, -1, 1, out=mix)
     
-    # Add some saturation/warmth by subtle clipping
-    track = track + 1
+    # Subtle compression (normalize, then reduce peaks), plus 1 dB of drive
+    # for saturation/warmth by subtle clipping, as one gain
+    mix *= normalize_gain(np.abs(mix).max()) * db_to_gain(1)
+    np.clip(mix, -1, 1, out=mix)
     
     # Final limiting
-    track = track.normalize(headroom=0.5)
+    mix *= normalize_gain(np.abs(mix).max(), headroom=0.5)
+    
+    # Quantize to 16-bit once
+    mix *= 32768
+    np.clip(mix, -32768, 32767, out=mix)
+    track = mix.astype(np.int16)
     
+    # The mix is already 16-bit PCM, so write it straight into a WAV container
     print("💾 Exporting epic techno track...")
-    track.export("epic_techno_masterpiece.wav", format="wav")
+    with wave.open("epic_techno_masterpiece.wav", "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(synth.sample_rate)
+        wav_file.writeframes(track.tobytes())
     print("✅ DONE! Your epic techno track is ready: epic_techno_masterpiece.wav")
-    print(f"   Duration: {len(track) / 1000:.1f} seconds ({num_bars} bars @ {bpm} BPM)")
+    print(f"   Duration: {len(track) / synth.sample_rate:.1f} seconds ({num_bars} bars @ {bpm} BPM)")
     print("   🔊 Turn it up and feel the bass!")
 
 if __name__ == "__main__":
@@ -3,8 +3,58 @@ from pydub import AudioSegment
 import mido
 import math
 import random
+import itertools
 import numpy as np
 from collections import defaultdict
+from functools import lru_cache
+
+# Linear gain of pydub's -120 dB fade floor
+SILENCE_GAIN = 10 ** (-120 / 20)
+
+# Linear factor for each whole-dB level, so the partials and mix skip the pow
+GAIN_FACTORS = {db: 10 ** (db / 20) for db in range(-60, 13)}
+
+def db_to_gain(gain_db):
+    """Linear amplitude factor for gain_db, from the table when it's a whole dB"""
+    return GAIN_FACTORS[gain_db] if gain_db in GAIN_FACTORS else 10 ** (gain_db / 20)
+
+@lru_cache(maxsize=1024)
+def _waveform(sample_rate, frequency, duration_ms, waveform, phase=0, detune=0):
+    """Read-only float32 samples in [-1, 1] for one oscillator; the track repeats
+    the same few notes, so cache it"""
+    num_samples = int(sample_rate * duration_ms / 1000)
+    freq = frequency * (1 + detune)
+    
+    # One buffer, worked in place: time, then phase in cycles wrapped to one
+    # cycle in float64, then the wave shaped in float32 (SIMD sin, half the bytes)
+    samples = np.arange(num_samples, dtype=np.float64)
+    samples *= freq / sample_rate
+    if phase and waveform not in ('sawtooth', 'triangle'):
+        samples += phase / (2 * np.pi)  # Only the sine-based waves take a phase
+    samples -= np.floor(samples)
+    samples = samples.astype(np.float32)
+    
+    if waveform in ('sawtooth', 'triangle'):
+        samples *= 2
+        samples -= 1
+        if waveform == 'triangle':
+            np.abs(samples, out=samples)
+            samples *= 2
+            samples -= 1
+    elif waveform == 'square':
+        # sign(sin) read straight off the phase: +1 for the first half-cycle
+        # (0 right on the zero crossing), -1 for the second
+        samples = np.where(samples < 0.5, samples > 0, np.float32(-1))
+    else:
+        samples *= 2 * np.pi
+        np.sin(samples, out=samples)
+    
+    samples.setflags(write=False)
+    return samples
+
+# Brass partials as (frequency multiple, waveform, gain_db): a bright sawtooth
+# stack, shared by brass_lead and both voices of brass_lead_stacked
+BRASS_PARTIALS = ((1, 'sawtooth', 0), (1.005, 'sawtooth', -1), (2, 'square', -8))
 
 # Advanced synthesizer engine
 class Synthesizer:
@@ -12,210 +62,285 @@ class Synthesizer:
         self.sample_rate = sample_rate
         
     def generate_waveform(self, frequency, duration_ms, waveform='sine', phase=0, detune=0):
-        """Generate waveforms with optional detuning"""
+        """Generate int16 waveforms with optional detuning"""
+        samples = _waveform(self.sample_rate, frequency, duration_ms, waveform, phase, detune) * 32767
+        return samples.astype(np.int16)
+    
+    def sum_partials(self, frequency, duration_ms, partials):
+        """Float32 sum of (frequency multiple, waveform, gain_db) oscillators in [-1, 1]"""
         num_samples = int(self.sample_rate * duration_ms / 1000)
-        t = np.arange(num_samples) / self.sample_rate
-        freq = frequency * (1 + detune)
-        
-        if waveform == 'sine':
-            samples = np.sin(2 * np.pi * freq * t + phase)
-        elif waveform == 'square':
-            samples = np.sign(np.sin(2 * np.pi * freq * t + phase))
-        elif waveform == 'sawtooth':
-            samples = 2 * (freq * t % 1) - 1
-        elif waveform == 'triangle':
-            samples = 2 * np.abs(2 * (freq * t % 1) - 1) - 1
-        else:
-            samples = np.sin(2 * np.pi * freq * t + phase)
-        
-        samples = (samples * 32767).astype(np.int16)
-        return AudioSegment(data=samples.tobytes(), sample_width=2, 
-                          frame_rate=self.sample_rate, channels=1)
+        stack = np.zeros(num_samples, dtype=np.float32)
+        scaled = np.empty_like(stack)  # Reused for each gained partial
+        
+        # Every add saturates at full scale, like the overlay chains this replaces
+        for multiple, waveform, partial_db in partials:
+            osc = _waveform(self.sample_rate, frequency * multiple, duration_ms, waveform)
+            np.multiply(osc, np.float32(db_to_gain(partial_db)), out=scaled)
+            stack += scaled
+            np.clip(stack, -1, 1, out=stack)
+        return stack
     
+    def stack_partials(self, frequency, duration_ms, partials, fade_in_ms, fade_out_ms, gain_db=0):
+        """Sum partials, then fade, apply gain_db and quantize once to read-only
+        int16 (the voices cache it)"""
+        num_samples = int(self.sample_rate * duration_ms / 1000)
+        stack = self.sum_partials(frequency, duration_ms, partials)
+        
+        # The fades and gain are one multiply on the same buffer, then one quantize
+        stack *= self.fade_envelope(num_samples, fade_in_ms, fade_out_ms)
+        stack *= 32767 * db_to_gain(gain_db)
+        samples = np.floor(stack, out=stack).astype(np.int16)
+        samples.setflags(write=False)
+        return samples
+    
+    @lru_cache(maxsize=256)
+    def fade_envelope(self, num_samples, fade_in_ms, fade_out_ms):
+        """Read-only linear fade in/out gain curve (from/to -120 dB) for num_samples"""
+        fade_in = min(int(self.sample_rate * fade_in_ms / 1000), num_samples)
+        fade_out = min(int(self.sample_rate * fade_out_ms / 1000), num_samples)
+        
+        envelope = np.ones(num_samples, dtype=np.float32)
+        envelope[:fade_in] = np.linspace(SILENCE_GAIN, 1, fade_in, endpoint=False)
+        envelope[num_samples - fade_out:] *= np.linspace(1, SILENCE_GAIN, fade_out, endpoint=False)
+        envelope.setflags(write=False)
+        return envelope
+    
+    @lru_cache(maxsize=512)
     def piano_like(self, frequency, duration_ms, velocity=100):
         """Piano-like sound with harmonics (for intro inspiration)"""
         # Fundamental + harmonics
-        piano = self.generate_waveform(frequency, duration_ms, 'sine')
-        piano = piano.overlay(self.generate_waveform(frequency * 2, duration_ms, 'sine') - 8)
-        piano = piano.overlay(self.generate_waveform(frequency * 3, duration_ms, 'sine') - 12)
-        piano = piano.overlay(self.generate_waveform(frequency * 4, duration_ms, 'sine') - 16)
+        partials = [(1, 'sine', 0), (2, 'sine', -8), (3, 'sine', -12), (4, 'sine', -16)]
         
-        # Piano-like envelope (fast attack, exponential decay)
-        piano = piano.fade_in(5).fade_out(int(duration_ms * 0.7))
-        
-        # Velocity scaling
+        # Piano-like envelope (fast attack, exponential decay), velocity scaled
         vel_scale = (velocity / 127.0) * 0.8 + 0.2
-        return piano - (1 - vel_scale) * 20
+        return self.stack_partials(frequency, duration_ms, partials, 5, int(duration_ms * 0.7),
+                                   gain_db=-(1 - vel_scale) * 20)
     
+    @lru_cache(maxsize=512)
     def deep_bass(self, frequency, duration_ms, fatness=3):
         """Super deep sub bass with overtones"""
-        # Sub oscillator
-        bass = self.generate_waveform(frequency, duration_ms, 'sine')
-        # Add slight square for punch
-        bass = bass.overlay(self.generate_waveform(frequency, duration_ms, 'square') - 12)
+        # Sub oscillator, plus slight square for punch
+        partials = [(1, 'sine', 0), (1, 'square', -12)]
         # Detuned layers for width
-        for i in range(fatness):
-            detune = (i + 1) * 0.003
-            bass = bass.overlay(self.generate_waveform(frequency, duration_ms, 'sawtooth', detune=detune) - 8)
+        partials += [(1 + i * 0.003, 'sawtooth', -8) for i in range(1, fatness + 1)]
         
-        bass = bass.fade_in(10).fade_out(80)
-        return bass
+        return self.stack_partials(frequency, duration_ms, partials, 10, 80)
     
+    @lru_cache(maxsize=512)
     def creepy_pad(self, frequency, duration_ms, modulation=0):
         """Atmospheric creepy pad (Lower Norfair style)"""
         # Multiple detuned oscillators
-        pad = self.generate_waveform(frequency, duration_ms, 'sine')
-        pad = pad.overlay(self.generate_waveform(frequency * 1.01, duration_ms, 'sine') - 2)
-        pad = pad.overlay(self.generate_waveform(frequency * 0.99, duration_ms, 'sine') - 2)
-        pad = pad.overlay(self.generate_waveform(frequency * 2, duration_ms, 'triangle') - 10)
-        pad = pad.overlay(self.generate_waveform(frequency * 1.5, duration_ms, 'sine') - 12)
+        partials = [(1, 'sine', 0), (1.01, 'sine', -2), (0.99, 'sine', -2),
+                    (2, 'triangle', -10), (1.5, 'sine', -12)]
         
         # Slow attack and release
-        pad = pad.fade_in(300).fade_out(500)
-        return pad - 10
+        return self.stack_partials(frequency, duration_ms, partials, 300, 500, gain_db=-10)
     
+    @lru_cache(maxsize=512)
     def brass_lead(self, frequency, duration_ms, velocity=80):
         """Bold brass lead (from Lower Norfair track 7)"""
-        # Bright sawtooth stack
-        lead = self.generate_waveform(frequency, duration_ms, 'sawtooth')
-        lead = lead.overlay(self.generate_waveform(frequency * 1.005, duration_ms, 'sawtooth') - 1)
-        lead = lead.overlay(self.generate_waveform(frequency * 2, duration_ms, 'square') - 8)
-        
         # Brass-like envelope
         attack = 50
         release = 150
-        lead = lead.fade_in(attack).fade_out(release)
         
         vel_scale = velocity / 127.0
-        return lead - ((1 - vel_scale) * 15)
+        return self.stack_partials(frequency, duration_ms, BRASS_PARTIALS, attack, release,
+                                   gain_db=-((1 - vel_scale) * 15))
     
+    def brass_lead_stacked(self, frequency, duration_ms, velocity=100, detune=1.01,
+                           velocity2=90, gain2_db=-2):
+        """Brass lead doubled by a detuned second voice, quantized once as a pair"""
+        num_samples = int(self.sample_rate * duration_ms / 1000)
+        lead = np.zeros(num_samples, dtype=np.float32)
+        
+        # Same partials and velocity curve as brass_lead, second voice gain2_db under the first
+        for voice_freq, voice_velocity, voice_db in [(frequency, velocity, 0),
+                                                     (frequency * detune, velocity2, gain2_db)]:
+            voice = self.sum_partials(voice_freq, duration_ms, BRASS_PARTIALS)
+            voice *= np.float32(db_to_gain(-(1 - voice_velocity / 127.0) * 15 + voice_db))
+            lead += voice
+        
+        # Both voices share the brass envelope; the pair saturates once at full scale
+        lead *= self.fade_envelope(num_samples, 50, 150)
+        np.clip(lead, -1, 1, out=lead)
+        lead *= 32767
+        samples = np.floor(lead, out=lead).astype(np.int16)
+        samples.setflags(write=False)
+        return samples
+    
+    @lru_cache(maxsize=512)
     def xylophone(self, frequency, duration_ms, velocity=92):
         """Bright xylophone sound (Brinstar style)"""
         # Very bright, short decay
-        xylo = self.generate_waveform(frequency, duration_ms, 'sine')
+        partials = [(1, 'sine', 0)]
         # Add lots of harmonics
-        for harm in range(2, 8):
-            xylo = xylo.overlay(self.generate_waveform(frequency * harm, duration_ms, 'sine') - (harm * 3))
+        partials += [(harm, 'sine', -(harm * 3)) for harm in range(2, 8)]
         
         # Short, percussive envelope
         decay_time = min(int(duration_ms * 0.6), 200)
-        xylo = xylo.fade_in(1).fade_out(decay_time)
         
         vel_scale = velocity / 127.0
-        return xylo - ((1 - vel_scale) * 20)
+        return self.stack_partials(frequency, duration_ms, partials, 1, decay_time,
+                                   gain_db=-((1 - vel_scale) * 20))
     
+    @lru_cache(maxsize=512)
     def acid_bass(self, frequency, duration_ms, resonance=0.8):
         """Classic 303 acid bass"""
-        acid = self.generate_waveform(frequency, duration_ms, 'sawtooth')
-        acid = acid.overlay(self.generate_waveform(frequency, duration_ms, 'square') - 6)
-        acid = acid.fade_in(2).fade_out(60)
-        return acid
+        # Square under the saw for bite
+        partials = [(1, 'sawtooth', 0), (1, 'square', -6)]
+        return self.stack_partials(frequency, duration_ms, partials, 2, 60)
+
+def sin_cycles(cycles):
+    """sin(2*pi*cycles), taken in float32 on the phase wrapped to one cycle"""
+    # NumPy's float32 sin is SIMD-vectorized (float64 isn't); wrapping first
+    # keeps float32 accurate to ~1e-7 however many cycles have elapsed
+    phase = (cycles - np.floor(cycles)).astype(np.float32)
+    phase *= 2 * np.pi
+    return np.sin(phase, out=phase)
 
 class DrumMachine:
-    def __init__(self, sample_rate=44100):
+    def __init__(self, sample_rate=44100, seed=None):
         self.sample_rate = sample_rate
-        
+        # One second of white noise drawn once; noise hits slice it at random offsets.
+        # The drums do all their DSP in float32, half the memory traffic of float64
+        self.rng = np.random.default_rng(seed)
+        self.noise_pool = self.rng.standard_normal(sample_rate, dtype=np.float32)
+    
+    def noise(self, num_samples):
+        """A fresh copy of num_samples of white noise from a random spot in the pool"""
+        if num_samples > len(self.noise_pool):
+            return self.rng.standard_normal(num_samples, dtype=np.float32)
+        start = self.rng.integers(0, len(self.noise_pool) - num_samples + 1)
+        return self.noise_pool[start:start + num_samples].copy()
+        
+    @lru_cache(maxsize=64)
     def kick(self, duration_ms=350, punch=1.0):
         """Punchy techno kick"""
         num_samples = int(self.sample_rate * duration_ms / 1000)
-        t = np.arange(num_samples) / self.sample_rate
+        t = np.arange(num_samples, dtype=np.float32) / np.float32(self.sample_rate)
         
-        freq = 150 * np.exp(-t * 10)
-        phase = np.cumsum(2 * np.pi * freq / self.sample_rate)
-        kick = np.sin(phase)
+        # Pitch drops as 150 * exp(-10t) Hz; the phase is its integral in closed
+        # form, 150/10 * (1 - exp(-10t)) cycles, rather than a running sum
+        kick = sin_cycles(150 / 10 * -np.expm1(-t * 10))
         
-        envelope = np.exp(-t * 12)
-        kick = kick * envelope
+        # Everything below works in place on the one kick buffer
+        kick *= np.exp(-t * 12)
         
         # Add click
-        click = np.exp(-t * 60) * punch
-        kick = kick + click * 0.4
-        
-        kick = np.clip(kick, -1, 1)
-        kick = (kick * 32767).astype(np.int16)
-        
-        return AudioSegment(data=kick.tobytes(), sample_width=2, 
-                          frame_rate=self.sample_rate, channels=1) + 3
+        click = np.exp(-t * 60)
+        click *= punch * 0.4
+        kick += click
+        
+        np.clip(kick, -1, 1, out=kick)
+        kick *= 32767
+        kick = apply_gain(kick.astype(np.int16), 3)
+        kick.setflags(write=False)
+        return kick
     
     def snare(self, duration_ms=180):
         """Snare with tone and noise"""
         num_samples = int(self.sample_rate * duration_ms / 1000)
-        t = np.arange(num_samples) / self.sample_rate
-        
-        tone = np.sin(2 * np.pi * 200 * t) + np.sin(2 * np.pi * 340 * t)
-        noise = np.random.randn(num_samples)
-        snare = tone * 0.3 + noise * 0.7
+        t = np.arange(num_samples, dtype=np.float32) / np.float32(self.sample_rate)
         
-        envelope = np.exp(-t * 22)
-        snare = snare * envelope
+        # Tone and noise are mixed, enveloped and scaled in place
+        snare = sin_cycles(200 * t)
+        snare += sin_cycles(340 * t)
+        snare *= 0.3
+        noise = self.noise(num_samples)
+        noise *= 0.7
+        snare += noise
         
-        snare = np.clip(snare, -1, 1)
-        snare = (snare * 32767 * 0.6).astype(np.int16)
+        snare *= np.exp(-t * 22)
         
-        return AudioSegment(data=snare.tobytes(), sample_width=2, 
-                          frame_rate=self.sample_rate, channels=1)
+        np.clip(snare, -1, 1, out=snare)
+        snare *= 32767 * 0.6
+        return snare.astype(np.int16)
     
     def hihat(self, duration_ms=50, closed=True):
         """Hi-hat"""
         num_samples = int(self.sample_rate * duration_ms / 1000)
-        t = np.arange(num_samples) / self.sample_rate
+        t = np.arange(num_samples, dtype=np.float32) / np.float32(self.sample_rate)
         
-        hihat = np.random.randn(num_samples)
+        hihat = self.noise(num_samples)
         for freq in [8000, 10000, 12000, 14000]:
-            hihat += np.sin(2 * np.pi * freq * t) * 0.1
+            partial = sin_cycles(freq * t)
+            partial *= 0.1
+            hihat += partial
         
         decay = 40 if closed else 15
-        envelope = np.exp(-t * decay)
-        hihat = hihat * envelope
+        hihat *= np.exp(-t * decay)
         
-        hihat = np.clip(hihat, -1, 1)
+        np.clip(hihat, -1, 1, out=hihat)
         gain = 0.3 if closed else 0.4
-        hihat = (hihat * 32767 * gain).astype(np.int16)
-        
-        return AudioSegment(data=hihat.tobytes(), sample_width=2, 
-                          frame_rate=self.sample_rate, channels=1)
+        hihat *= 32767 * gain
+        return hihat.astype(np.int16)
     
     def clap(self, duration_ms=140):
         """Hand clap"""
         num_samples = int(self.sample_rate * duration_ms / 1000)
-        t = np.arange(num_samples) / self.sample_rate
-        
-        clap = np.random.randn(num_samples)
-        envelope = (np.exp(-t * 35) + 
-                   np.exp(-(t - 0.01) * 35) * 0.8 +
-                   np.exp(-(t - 0.02) * 35) * 0.6)
-        envelope = np.maximum(envelope, 0)
-        
-        clap = clap * envelope
-        clap = np.clip(clap, -1, 1)
-        clap = (clap * 32767 * 0.5).astype(np.int16)
-        
-        return AudioSegment(data=clap.tobytes(), sample_width=2, 
-                          frame_rate=self.sample_rate, channels=1)
+        t = np.arange(num_samples, dtype=np.float32) / np.float32(self.sample_rate)
+        
+        clap = self.noise(num_samples)
+        # Three overlapping decays; a sum of exponentials is never negative
+        envelope = np.exp(-t * 35)
+        for delay, level in [(0.01, 0.8), (0.02, 0.6)]:
+            burst = np.exp(-(t - delay) * 35)
+            burst *= level
+            envelope += burst
+        
+        clap *= envelope
+        np.clip(clap, -1, 1, out=clap)
+        clap *= 32767 * 0.5
+        return clap.astype(np.int16)
     
+    @lru_cache(maxsize=16)
     def timpani(self, duration_ms=300):
         """Timpani hit (Brinstar style)"""
         num_samples = int(self.sample_rate * duration_ms / 1000)
-        t = np.arange(num_samples) / self.sample_rate
+        t = np.arange(num_samples, dtype=np.float32) / np.float32(self.sample_rate)
         
-        # Low frequency tone sweep
-        freq = 80 * np.exp(-t * 3)
-        phase = np.cumsum(2 * np.pi * freq / self.sample_rate)
-        timp = np.sin(phase)
+        # Low frequency tone sweep, 80 * exp(-3t) Hz, phase integrated in closed form
+        timp = sin_cycles(80 / 3 * -np.expm1(-t * 3))
         
-        envelope = np.exp(-t * 8)
-        timp = timp * envelope
+        timp *= np.exp(-t * 8)
         
-        timp = np.clip(timp, -1, 1)
-        timp = (timp * 32767 * 0.7).astype(np.int16)
-        
-        return AudioSegment(data=timp.tobytes(), sample_width=2, 
-                          frame_rate=self.sample_rate, channels=1)
+        np.clip(timp, -1, 1, out=timp)
+        timp *= 32767 * 0.7
+        timp = timp.astype(np.int16)
+        timp.setflags(write=False)
+        return timp
 
 def midi_to_freq(midi_note):
     """Convert MIDI note to frequency"""
     return 440.0 * (2.0 ** ((midi_note - 69) / 12.0))
 
+# Frequency of every MIDI note, so the bar loops index instead of calling pow
+MIDI_FREQ = [midi_to_freq(note) for note in range(128)]
+
+def apply_gain(samples, gain_db):
+    """Same scale, saturate and floor as AudioSegment + gain_db, on 16-bit samples"""
+    return np.floor(np.clip(samples * db_to_gain(gain_db), -32768, 32767)).astype(np.int16)
+
+def normalize_gain(peak, headroom=0.1):
+    """Linear gain that brings peak to headroom dB below full scale, like AudioSegment.normalize"""
+    return 32768 * 10 ** (-headroom / 20) / peak if peak else 1.0
+
+def to_segment(samples, sample_rate=44100):
+    """Wrap mono int16 samples in an AudioSegment, for callers that want pydub effects"""
+    return AudioSegment(data=samples.tobytes(), sample_width=2,
+                        frame_rate=sample_rate, channels=1)
+
+def mix_at(mix, samples, position_ms, gain_db=0, sample_rate=44100):
+    """Add int16 samples into the int32 mix buffer at position_ms, gain_db louder"""
+    start = int(position_ms * sample_rate / 1000)
+    samples = samples[:max(len(mix) - start, 0)]
+    if gain_db:
+        samples = apply_gain(samples, gain_db)
+    # Only the slice under the sound is touched; it saturates at 16-bit like overlay
+    segment = mix[start:start + len(samples)]
+    segment += samples
+    np.clip(segment, -32768, 32767, out=segment)
+
 def parse_midi_advanced(filepath):
     """Extract detailed note patterns from MIDI"""
     try:
@@ -250,8 +375,12 @@ def parse_midi_advanced(filepath):
     except:
         return []
 
-def generate_epic_techno_track():
-    """Generate ULTIMATE techno track using MIDI inspiration"""
+def generate_epic_techno_track(analyze_midi=False):
+    """Generate ULTIMATE techno track using MIDI inspiration
+
+    The arrangement below is hardcoded from the reference MIDIs, so parsing
+    them is only needed when ``analyze_midi`` is set to print a summary.
+    """
     print("🎵 TRACK 02 - SUPER METROID TECHNO FUSION")
     print("=" * 60)
     
@@ -259,11 +388,15 @@ def generate_epic_techno_track():
     synth = Synthesizer()
     drums = DrumMachine()
     
-    # Parse all MIDI files
-    print("\n🎹 Analyzing MIDI sources...")
-    lower_norfair = parse_midi_advanced('reference/Lower Norfair 2 MIDI.mid')
-    brinstar = parse_midi_advanced('reference/brinstar-1-2-.mid')
-    intro = parse_midi_advanced('reference/introduction.mid')
+    # Parse all MIDI files (patterns below are already baked in)
+    if analyze_midi:
+        print("\n🎹 Analyzing MIDI sources...")
+        for midi_file in ('reference/Lower Norfair 2 MIDI.mid',
+                          'reference/brinstar-1-2-.mid',
+                          'reference/introduction.mid'):
+            tracks_data = parse_midi_advanced(midi_file)
+            num_notes = sum(len(t['notes']) for t in tracks_data)
+            print(f"   {midi_file}: {len(tracks_data)} tracks, {num_notes} notes")
     
     # Extract patterns
     print("\n📊 Extracting musical patterns...")
@@ -297,293 +430,308 @@ def generate_epic_techno_track():
     print(f"\n🎛️  Building {num_bars} bars @ {bpm} BPM...")
     print(f"   Total duration: ~{num_bars * bar_duration / 1000:.0f} seconds\n")
     
-    track = AudioSegment.silent(duration=int(bar_duration * num_bars))
+    # Kicks and timpani are deterministic and cached by DrumMachine. The noise
+    # drums cycle through a few takes so repeated hits don't sound identical
+    snares = itertools.cycle([drums.snare() for _ in range(8)])
+    claps = itertools.cycle([drums.clap() for _ in range(8)])
+    hihats = {closed: itertools.cycle([drums.hihat(closed=closed) for _ in range(8)])
+              for closed in (True, False)}
+    
+    # Note positions (ms) on the grid, worked out once instead of in every loop
+    bar_starts = [int(bar * bar_duration) for bar in range(num_bars)]
+    beats = [int(beat * beat_duration) for beat in range(4)]
+    eighths = [int(eighth * beat_duration / 2) for eighth in range(8)]
+    sixteenths = [int(sixteenth * beat_duration / 4) for sixteenth in range(16)]
+    
+    # One int32 buffer that every sound is summed into, instead of overlaying
+    # each sound onto a fresh copy of the whole track
+    mix = np.zeros(int(int(bar_duration * num_bars) * synth.sample_rate / 1000), dtype=np.int32)
     
     # ========== INTRO (Bars 0-8) - Piano & Atmosphere ==========
     print("   [Intro 0-8] Atmospheric piano intro...")
     for bar in range(8):
-        bar_start = int(bar * bar_duration)
+        bar_start = bar_starts[bar]
         
         # Repeating piano note (intro.mid style)
         if bar < 4:
             for beat in range(4):
-                pos = bar_start + int(beat * beat_duration)
-                piano = synth.piano_like(midi_to_freq(piano_note), beat_duration * 0.8)
-                track = track.overlay(piano - 18, position=pos)
+                pos = bar_start + beats[beat]
+                piano = synth.piano_like(MIDI_FREQ[piano_note], beat_duration * 0.8)
+                mix_at(mix, piano, pos, -18)
         
         # Add creepy pads from bar 2
         if bar >= 2:
             pad_idx = bar % len(creep_pad_notes)
-            pad_freq = midi_to_freq(creep_pad_notes[pad_idx])
+            pad_freq = MIDI_FREQ[creep_pad_notes[pad_idx]]
             pad = synth.creepy_pad(pad_freq, bar_duration * 2)
-            track = track.overlay(pad - 22, position=bar_start)
+            mix_at(mix, pad, bar_start, -22)
         
         # Kick starts at bar 6
         if bar >= 6:
             for beat in range(4):
-                kick_pos = bar_start + int(beat * beat_duration)
-                track = track.overlay(drums.kick(), position=kick_pos)
+                kick_pos = bar_start + beats[beat]
+                mix_at(mix, drums.kick(), kick_pos)
         
         # Hi-hats from bar 7
         if bar >= 7:
             for sixteenth in range(16):
-                hihat_pos = bar_start + int(sixteenth * beat_duration / 4)
-                track = track.overlay(drums.hihat(closed=True) - 3, position=hihat_pos)
+                hihat_pos = bar_start + sixteenths[sixteenth]
+                mix_at(mix, next(hihats[True]), hihat_pos, -3)
     
     # ========== BUILD (Bars 8-16) - Adding layers ==========
     print("   [Build 8-16] Building energy...")
     for bar in range(8, 16):
-        bar_start = int(bar * bar_duration)
+        bar_start = bar_starts[bar]
         
         # Kick - four on the floor
         for beat in range(4):
-            kick_pos = bar_start + int(beat * beat_duration)
-            track = track.overlay(drums.kick(punch=1.2), position=kick_pos)
+            kick_pos = bar_start + beats[beat]
+            mix_at(mix, drums.kick(punch=1.2), kick_pos)
         
         # Hi-hats 16ths
         for sixteenth in range(16):
-            hihat_pos = bar_start + int(sixteenth * beat_duration / 4)
+            hihat_pos = bar_start + sixteenths[sixteenth]
             closed = sixteenth % 4 != 3
-            track = track.overlay(drums.hihat(closed=closed) - 2, position=hihat_pos)
+            mix_at(mix, next(hihats[closed]), hihat_pos, -2)
         
         # Deep bass enters (bar 10)
         if bar >= 10:
             for beat in range(4):
                 note_idx = (bar * 4 + beat) % len(bass_pattern)
-                bass_freq = midi_to_freq(bass_pattern[note_idx])
+                bass_freq = MIDI_FREQ[bass_pattern[note_idx]]
                 bass = synth.deep_bass(bass_freq, beat_duration * 0.9)
-                track = track.overlay(bass - 7, position=bar_start + int(beat * beat_duration))
+                mix_at(mix, bass, bar_start + beats[beat], -7)
         
         # Xylophone melody (bar 12)
         if bar >= 12:
             for eighth in range(8):
                 xylo_idx = (bar * 8 + eighth) % len(xylo_pattern)
-                xylo_freq = midi_to_freq(xylo_pattern[xylo_idx])
-                xylo_pos = bar_start + int(eighth * beat_duration / 2)
+                xylo_freq = MIDI_FREQ[xylo_pattern[xylo_idx]]
+                xylo_pos = bar_start + eighths[eighth]
                 xylo = synth.xylophone(xylo_freq, beat_duration * 0.3)
-                track = track.overlay(xylo - 12, position=xylo_pos)
+                mix_at(mix, xylo, xylo_pos, -12)
         
         # Snares on 2 and 4 (from bar 14)
         if bar >= 14:
             for snare_beat in [1, 3]:
-                snare_pos = bar_start + int(snare_beat * beat_duration)
-                track = track.overlay(drums.snare(), position=snare_pos)
+                snare_pos = bar_start + beats[snare_beat]
+                mix_at(mix, next(snares), snare_pos)
         
         # Creepy pads throughout
         if bar % 2 == 0:
             pad_idx = (bar // 2) % len(creep_pad_notes)
-            pad_freq = midi_to_freq(creep_pad_notes[pad_idx])
+            pad_freq = MIDI_FREQ[creep_pad_notes[pad_idx]]
             pad = synth.creepy_pad(pad_freq, bar_duration * 2)
-            track = track.overlay(pad - 20, position=bar_start)
+            mix_at(mix, pad, bar_start, -20)
     
     # ========== DROP 1 (Bars 16-32) - Full power ==========
     print("   [Drop1 16-32] FULL POWER DROP 💥")
     for bar in range(16, 32):
-        bar_start = int(bar * bar_duration)
+        bar_start = bar_starts[bar]
         
         # Heavy kick
         for beat in range(4):
-            kick_pos = bar_start + int(beat * beat_duration)
-            track = track.overlay(drums.kick(punch=1.5) + 2, position=kick_pos)
+            kick_pos = bar_start + beats[beat]
+            mix_at(mix, drums.kick(punch=1.5), kick_pos, 2)
         
         # Snare + clap layers
         for hit_beat in [1, 3]:
-            hit_pos = bar_start + int(hit_beat * beat_duration)
-            track = track.overlay(drums.snare() + 1, position=hit_pos)
-            track = track.overlay(drums.clap() - 1, position=hit_pos + 5)
+            hit_pos = bar_start + beats[hit_beat]
+            mix_at(mix, next(snares), hit_pos, 1)
+            mix_at(mix, next(claps), hit_pos + 5, -1)
         
         # Complex hi-hat pattern
         for sixteenth in range(16):
-            hihat_pos = bar_start + int(sixteenth * beat_duration / 4)
+            hihat_pos = bar_start + sixteenths[sixteenth]
             closed = not (sixteenth % 4 == 3)
             accent = -1 if sixteenth % 4 == 0 else -3
-            track = track.overlay(drums.hihat(closed=closed) + accent, position=hihat_pos)
+            mix_at(mix, next(hihats[closed]), hihat_pos, accent)
         
         # Timpani accents (every 4 bars)
         if bar % 4 == 0:
             for beat in [0, 2]:
-                timp_pos = bar_start + int(beat * beat_duration)
-                track = track.overlay(drums.timpani(), position=timp_pos)
+                timp_pos = bar_start + beats[beat]
+                mix_at(mix, drums.timpani(), timp_pos)
         
         # Dual bass layers
         for beat in range(4):
             note_idx = (bar * 4 + beat) % len(bass_pattern)
-            bass_freq = midi_to_freq(bass_pattern[note_idx])
-            bass_pos = bar_start + int(beat * beat_duration)
+            bass_freq = MIDI_FREQ[bass_pattern[note_idx]]
+            bass_pos = bar_start + beats[beat]
             
             # Layer 1: Deep sub
             bass1 = synth.deep_bass(bass_freq, beat_duration * 0.9, fatness=4)
-            track = track.overlay(bass1 - 5, position=bass_pos)
+            mix_at(mix, bass1, bass_pos, -5)
             
             # Layer 2: Acid mid-bass (every other beat)
             if beat % 2 == 0:
                 acid = synth.acid_bass(bass_freq * 2, beat_duration * 0.7)
-                track = track.overlay(acid - 10, position=bass_pos)
+                mix_at(mix, acid, bass_pos, -10)
         
         # Brass lead melody
         if bar >= 20:
             for step in range(8):
                 if random.random() > 0.25:
                     lead_idx = (bar * 8 + step) % len(brass_lead_notes)
-                    lead_freq = midi_to_freq(brass_lead_notes[lead_idx])
-                    lead_pos = bar_start + int(step * beat_duration / 2)
+                    lead_freq = MIDI_FREQ[brass_lead_notes[lead_idx]]
+                    lead_pos = bar_start + eighths[step]
                     lead = synth.brass_lead(lead_freq, beat_duration * 0.4)
-                    track = track.overlay(lead - 9, position=lead_pos)
+                    mix_at(mix, lead, lead_pos, -9)
         
         # Xylophone counter-melody
         if bar % 2 == 0:
             for eighth in range(8):
                 if random.random() > 0.4:
                     xylo_idx = (bar * 8 + eighth) % len(xylo_pattern)
-                    xylo_freq = midi_to_freq(xylo_pattern[xylo_idx] + 12)  # Octave up
-                    xylo_pos = bar_start + int(eighth * beat_duration / 2)
+                    xylo_freq = MIDI_FREQ[xylo_pattern[xylo_idx] + 12]  # Octave up
+                    xylo_pos = bar_start + eighths[eighth]
                     xylo = synth.xylophone(xylo_freq, beat_duration * 0.25)
-                    track = track.overlay(xylo - 14, position=xylo_pos)
+                    mix_at(mix, xylo, xylo_pos, -14)
         
         # Atmospheric pads
         if bar % 4 == 0:
             pad_idx = (bar // 4) % len(creep_pad_notes)
-            pad_freq = midi_to_freq(creep_pad_notes[pad_idx])
+            pad_freq = MIDI_FREQ[creep_pad_notes[pad_idx]]
             pad = synth.creepy_pad(pad_freq, bar_duration * 4)
-            track = track.overlay(pad - 22, position=bar_start)
+            mix_at(mix, pad, bar_start, -22)
     
     # ========== BREAKDOWN (Bars 32-40) - Atmospheric ==========
     print("   [Breakdown 32-40] Atmospheric section...")
     for bar in range(32, 40):
-        bar_start = int(bar * bar_duration)
+        bar_start = bar_starts[bar]
         
         # Sparse kick (drops out progressively)
         if bar < 36:
             for beat in [0, 2]:
-                kick_pos = bar_start + int(beat * beat_duration)
-                track = track.overlay(drums.kick() - 2, position=kick_pos)
+                kick_pos = bar_start + beats[beat]
+                mix_at(mix, drums.kick(), kick_pos, -2)
         
         # Soft hi-hats
         for eighth in range(8):
             if random.random() > 0.4:
-                hihat_pos = bar_start + int(eighth * beat_duration / 2)
-                track = track.overlay(drums.hihat(closed=False) - 5, position=hihat_pos)
+                hihat_pos = bar_start + eighths[eighth]
+                mix_at(mix, next(hihats[False]), hihat_pos, -5)
         
         # Piano melody returns
         for beat in range(4):
-            piano_pos = bar_start + int(beat * beat_duration)
-            piano = synth.piano_like(midi_to_freq(piano_note + (bar % 3) * 2), beat_duration * 1.2)
-            track = track.overlay(piano - 15, position=piano_pos)
+            piano_pos = bar_start + beats[beat]
+            piano = synth.piano_like(MIDI_FREQ[piano_note + (bar % 3) * 2], beat_duration * 1.2)
+            mix_at(mix, piano, piano_pos, -15)
         
         # Deep bass triad chords (intro style)
         if bar % 2 == 0:
             for note in deep_bass_triad:
-                bass_freq = midi_to_freq(note)
+                bass_freq = MIDI_FREQ[note]
                 bass = synth.deep_bass(bass_freq, bar_duration * 2)
-                track = track.overlay(bass - 12, position=bar_start)
+                mix_at(mix, bass, bar_start, -12)
         
         # Organ melody
         for beat in range(4):
             organ_idx = (bar * 4 + beat) % len(organ_notes)
-            organ_freq = midi_to_freq(organ_notes[organ_idx])
-            organ_pos = bar_start + int(beat * beat_duration)
+            organ_freq = MIDI_FREQ[organ_notes[organ_idx]]
+            organ_pos = bar_start + beats[beat]
             organ = synth.brass_lead(organ_freq, beat_duration * 1.5, velocity=60)
-            track = track.overlay(organ - 14, position=organ_pos)
+            mix_at(mix, organ, organ_pos, -14)
         
         # Lush pads
         pad_idx = bar % len(creep_pad_notes)
-        pad_freq = midi_to_freq(creep_pad_notes[pad_idx])
+        pad_freq = MIDI_FREQ[creep_pad_notes[pad_idx]]
         pad = synth.creepy_pad(pad_freq, bar_duration * 2)
-        track = track.overlay(pad - 18, position=bar_start)
+        mix_at(mix, pad, bar_start, -18)
     
     # ========== BUILD 2 (Bars 40-48) - Rising tension ==========
     print("   [Build2 40-48] Building to final drop...")
     for bar in range(40, 48):
-        bar_start = int(bar * bar_duration)
+        bar_start = bar_starts[bar]
         
         # Kick returns
         for beat in range(4):
-            kick_pos = bar_start + int(beat * beat_duration)
+            kick_pos = bar_start + beats[beat]
             punch = 1.0 + (bar - 40) * 0.1
-            track = track.overlay(drums.kick(punch=punch), position=kick_pos)
+            mix_at(mix, drums.kick(punch=punch), kick_pos)
         
         # Hi-hats intensify
         for sixteenth in range(16):
-            hihat_pos = bar_start + int(sixteenth * beat_duration / 4)
+            hihat_pos = bar_start + sixteenths[sixteenth]
             closed = sixteenth % 4 != 3
-            track = track.overlay(drums.hihat(closed=closed) - 1, position=hihat_pos)
+            mix_at(mix, next(hihats[closed]), hihat_pos, -1)
         
         # Bass returns (bar 44)
         if bar >= 44:
             for beat in range(4):
                 note_idx = (bar * 4 + beat) % len(bass_pattern)
-                bass_freq = midi_to_freq(bass_pattern[note_idx])
-                bass_pos = bar_start + int(beat * beat_duration)
+                bass_freq = MIDI_FREQ[bass_pattern[note_idx]]
+                bass_pos = bar_start + beats[beat]
                 bass = synth.deep_bass(bass_freq, beat_duration * 0.9)
-                track = track.overlay(bass - 6, position=bass_pos)
+                mix_at(mix, bass, bass_pos, -6)
         
         # Snares return (bar 46)
         if bar >= 46:
             for snare_beat in [1, 3]:
-                snare_pos = bar_start + int(snare_beat * beat_duration)
-                track = track.overlay(drums.snare(), position=snare_pos)
+                snare_pos = bar_start + beats[snare_beat]
+                mix_at(mix, next(snares), snare_pos)
         
         # Rising xylophone runs
         for sixteenth in range(16):
             if random.random() > 0.6:
                 xylo_note = xylo_pattern[sixteenth % len(xylo_pattern)] + (bar - 40) * 2
-                xylo_freq = midi_to_freq(xylo_note)
-                xylo_pos = bar_start + int(sixteenth * beat_duration / 4)
+                xylo_freq = MIDI_FREQ[xylo_note]
+                xylo_pos = bar_start + sixteenths[sixteenth]
                 xylo = synth.xylophone(xylo_freq, beat_duration * 0.2)
-                track = track.overlay(xylo - 13, position=xylo_pos)
+                mix_at(mix, xylo, xylo_pos, -13)
     
     # ========== FINAL DROP (Bars 48-64) - MAXIMUM ENERGY ==========
     print("   [Final Drop 48-64] ABSOLUTE CHAOS 🔥🔥🔥")
     for bar in range(48, 64):
-        bar_start = int(bar * bar_duration)
+        bar_start = bar_starts[bar]
         
         # MASSIVE KICK
         for beat in range(4):
-            kick_pos = bar_start + int(beat * beat_duration)
-            track = track.overlay(drums.kick(punch=2.0) + 4, position=kick_pos)
+            kick_pos = bar_start + beats[beat]
+            mix_at(mix, drums.kick(punch=2.0), kick_pos, 4)
         
         # Layered snare/clap/timpani
         for hit_beat in [1, 3]:
-            hit_pos = bar_start + int(hit_beat * beat_duration)
-            track = track.overlay(drums.snare() + 2, position=hit_pos)
-            track = track.overlay(drums.clap(), position=hit_pos + 5)
-            track = track.overlay(drums.timpani() - 3, position=hit_pos - 10)
+            hit_pos = bar_start + beats[hit_beat]
+            mix_at(mix, next(snares), hit_pos, 2)
+            mix_at(mix, next(claps), hit_pos + 5)
+            mix_at(mix, drums.timpani(), hit_pos - 10, -3)
         
         # Insane hi-hat pattern
         for sixteenth in range(16):
-            hihat_pos = bar_start + int(sixteenth * beat_duration / 4)
+            hihat_pos = bar_start + sixteenths[sixteenth]
             closed = not (sixteenth % 4 == 3 or sixteenth % 8 == 5)
             accent = 0 if sixteenth % 4 == 0 else -2
-            track = track.overlay(drums.hihat(closed=closed) + accent, position=hihat_pos)
+            mix_at(mix, next(hihats[closed]), hihat_pos, accent)
         
         # Triple bass layers
         for beat in range(4):
             note_idx = (bar * 4 + beat) % len(bass_pattern)
-            bass_freq = midi_to_freq(bass_pattern[note_idx])
-            bass_pos = bar_start + int(beat * beat_duration)
+            bass_freq = MIDI_FREQ[bass_pattern[note_idx]]
+            bass_pos = bar_start + beats[beat]
             
             # Layer 1: Sub
             bass1 = synth.deep_bass(bass_freq, beat_duration * 0.9, fatness=5)
-            track = track.overlay(bass1 - 3, position=bass_pos)
+            mix_at(mix, bass1, bass_pos, -3)
             
             # Layer 2: Mid acid
             acid1 = synth.acid_bass(bass_freq * 2, beat_duration * 0.7)
-            track = track.overlay(acid1 - 8, position=bass_pos)
+            mix_at(mix, acid1, bass_pos, -8)
             
             # Layer 3: High acid (offbeat)
             if beat % 2 == 1:
                 acid2 = synth.acid_bass(bass_freq * 4, beat_duration * 0.5)
-                track = track.overlay(acid2 - 12, position=bass_pos)
+                mix_at(mix, acid2, bass_pos, -12)
         
         # Aggressive brass lead stabs
         for step in range(8):
             if random.random() > 0.15:
                 lead_idx = (bar * 8 + step) % len(brass_lead_notes)
                 octave_shift = 12 if step % 4 < 2 else 0
-                lead_freq = midi_to_freq(brass_lead_notes[lead_idx] + octave_shift)
-                lead_pos = bar_start + int(step * beat_duration / 2)
+                lead_freq = MIDI_FREQ[brass_lead_notes[lead_idx] + octave_shift]
+                lead_pos = bar_start + eighths[step]
                 lead = synth.brass_lead(lead_freq, beat_duration * 0.35, velocity=95)
-                track = track.overlay(lead - 7, position=lead_pos)
+                mix_at(mix, lead, lead_pos, -7)
         
         # Xylophone chaos
         if bar % 2 == 1:
@@ -591,30 +739,39 @@ def generate_epic_techno_track():
                 if random.random() > 0.5:
                     xylo_idx = (bar * 16 + sixteenth) % len(xylo_pattern)
                     xylo_note = xylo_pattern[xylo_idx] + 24  # 2 octaves up
-                    xylo_freq = midi_to_freq(xylo_note)
-                    xylo_pos = bar_start + int(sixteenth * beat_duration / 4)
+                    xylo_freq = MIDI_FREQ[xylo_note]
+                    xylo_pos = bar_start + sixteenths[sixteenth]
                     xylo = synth.xylophone(xylo_freq, beat_duration * 0.15)
-                    track = track.overlay(xylo - 11, position=xylo_pos)
+                    mix_at(mix, xylo, xylo_pos, -11)
         
         # Deep organ bass notes (every 2 bars)
         if bar % 2 == 0:
             organ_note = organ_notes[0] - 12  # Very low
-            organ_freq = midi_to_freq(organ_note)
+            organ_freq = MIDI_FREQ[organ_note]
             organ = synth.brass_lead(organ_freq, bar_duration * 2, velocity=100)
-            track = track.overlay(organ - 10, position=bar_start)
+            mix_at(mix, organ, bar_start, -10)
         
         # Massive pad layers
         if bar % 4 == 0:
             for i, pad_note in enumerate(creep_pad_notes):
-                pad_freq = midi_to_freq(pad_note)
+                pad_freq = MIDI_FREQ[pad_note]
                 pad = synth.creepy_pad(pad_freq, bar_duration * 4)
-                track = track.overlay(pad - (20 + i * 2), position=bar_start)
+                mix_at(mix, pad, bar_start, -(20 + i * 2))
     
     # ========== MASTERING ==========
     print("\n🎚️  Mastering...")
-    track = track.normalize(headroom=1.0)
-    track = track + 1.5
-    track = track.normalize(headroom=0.3)
+    # Normalize to 1 dB of headroom and drive 1.5 dB into the 16-bit ceiling,
+    # then normalize the clipped peak to 0.3 dB of headroom. The clipped peak
+    # follows from the first one, so the chain is one peak scan and one gain pass
+    low, high = int(mix.min()), int(mix.max())
+    drive = normalize_gain(max(high, -low), headroom=1.0) * 10 ** (1.5 / 20)
+    clipped_peak = max(min(high * drive, 32767), min(-low * drive, 32768))
+    track = mix.astype(np.float32)  # Exact: the mix never leaves the 16-bit range
+    track *= drive
+    np.clip(track, -32768, 32767, out=track)
+    track *= normalize_gain(clipped_peak, headroom=0.3)
+    track = np.floor(track, out=track).astype(np.int16)
+    track = to_segment(track, synth.sample_rate)
     
     # Export
     print("💾 Exporting...")